@@ -48,7 +48,10 @@ class BatmanManager:
         }
         
         for manager_name, manager_class in manager_classes.items():
-            manager_config = self.config.get_manager_config(manager_name)
+            manager_config = dict(self.config.get_manager_config(manager_name))
+            manager_config.setdefault('max_parallel_jobs', self.config.get('global_settings.max_parallel_jobs', 4))
+            manager_config.setdefault('externally_managed_strategy',
+                                      self.config.get('global_settings.externally_managed_strategy', 'prompt'))
             
             if manager_config.get('enabled', True):
                 try:
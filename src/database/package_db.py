@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 from datetime import datetime
 
+from ..utils.config import _atomic_write
+
 @dataclass
 class PackageInfo:
     """Information about an installed package"""
@@ -61,8 +63,8 @@ class PackageDatabase:
         for pkg_key, pkg_info in self.packages.items():
             data[pkg_key] = pkg_info.to_dict()
         
-        with open(self.db_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        # Written on every install and remove; never leave it truncated
+        _atomic_write(self.db_path, json.dumps(data, indent=2).encode())
     
     def _get_package_key(self, name: str, manager: str) -> str:
         """Generate unique key for package"""
@@ -2,10 +2,14 @@
 Base package manager class for Batman package manager
 """
 
+import locale
+import os
+import selectors
 import subprocess
 import shutil
+import signal
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any, Tuple
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 from pathlib import Path
 
 class PackageManagerBase(ABC):
@@ -18,6 +22,7 @@ class PackageManagerBase(ABC):
         self.enabled = config.get('enabled', True)
         self.install_dir = Path(config.get('install_dir', '/tmp'))
         self.auto_detect_files = config.get('auto_detect_files', [])
+        self.max_parallel_jobs = max(1, config.get('max_parallel_jobs', 4))
     
     @abstractmethod
     def is_available(self) -> bool:
@@ -29,6 +34,10 @@ class PackageManagerBase(ABC):
         """Install a package"""
         pass
     
+    def install_many(self, specs: List[Tuple[str, Optional[str]]], **kwargs) -> List[str]:
+        """Install several (name, version) packages, returning the names that succeeded"""
+        return [name for name, version in specs if self.install(name, version, **kwargs)]
+    
     @abstractmethod
     def update(self, package_name: str, **kwargs) -> bool:
         """Update a package"""
@@ -49,36 +58,58 @@ class PackageManagerBase(ABC):
         """List installed packages"""
         pass
     
+    def iter_installed(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Iterate over installed packages; managers that can stream override this"""
+        yield from self.list_installed(**kwargs)
+    
     @abstractmethod
     def get_package_info(self, package_name: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a package"""
         pass
     
+    def get_package_info_many(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get detailed information about several packages, keyed by package name"""
+        return {name: self.get_package_info(name) for name in package_names}
+    
     @abstractmethod
     def is_installed(self, package_name: str) -> bool:
         """Check if a package is installed"""
         pass
     
+    def are_installed(self, package_names: List[str]) -> Dict[str, bool]:
+        """Check several packages at once, keyed by package name"""
+        return {name: self.is_installed(name) for name in package_names}
+    
     @abstractmethod
     def get_version(self, package_name: str) -> Optional[str]:
         """Get installed version of a package"""
         pass
     
     def run_command(self, command: List[str], capture_output: bool = True, 
-                   check: bool = True, **kwargs) -> subprocess.CompletedProcess:
+                   check: bool = True, log_output: bool = True, **kwargs) -> subprocess.CompletedProcess:
         """Run a shell command and return the result"""
         try:
             self.logger.debug(f"Running command: {' '.join(command)}")
-            result = subprocess.run(
-                command,
-                capture_output=capture_output,
-                text=True,
-                check=check,
-                **kwargs
-            )
+            if capture_output and not kwargs and hasattr(os, 'posix_spawnp'):
+                # Plain captured runs skip Popen's fork/exec machinery
+                result = self._spawn_captured(command)
+                if check:
+                    result.check_returncode()
+            else:
+                result = subprocess.run(
+                    command,
+                    capture_output=capture_output,
+                    text=True,
+                    check=check,
+                    **kwargs
+                )
             
             if result.stdout:
-                self.logger.debug(f"Command output: {result.stdout.strip()}")
+                if log_output:
+                    self.logger.debug(f"Command output: {result.stdout.strip()}")
+                else:
+                    # Large machine-readable output; its size is enough for the log
+                    self.logger.debug(f"Command output: {len(result.stdout)} characters")
             if result.stderr:
                 self.logger.debug(f"Command error: {result.stderr.strip()}")
                 
@@ -92,6 +123,99 @@ class PackageManagerBase(ABC):
                 self.logger.error(f"Stderr: {e.stderr}")
             raise
     
+    def _spawn_captured(self, command: List[str]) -> subprocess.CompletedProcess:
+        """Run a command via os.posix_spawnp, capturing stdout and stderr as text"""
+        stdout_r, stdout_w = os.pipe()
+        stderr_r, stderr_w = os.pipe()
+        try:
+            pid = os.posix_spawnp(
+                command[0],
+                command,
+                os.environ,
+                # The pipe fds are non-inheritable, so only the dup'd ends
+                # reach the child, as with close_fds
+                file_actions=[
+                    (os.POSIX_SPAWN_DUP2, stdout_w, 1),
+                    (os.POSIX_SPAWN_DUP2, stderr_w, 2),
+                ],
+                # Python ignores these; give the child the defaults, as subprocess does
+                setsigdef=(signal.SIGPIPE, signal.SIGXFSZ)
+            )
+        except BaseException:
+            for fd in (stdout_r, stdout_w, stderr_r, stderr_w):
+                os.close(fd)
+            raise
+        
+        os.close(stdout_w)
+        os.close(stderr_w)
+        try:
+            stdout, stderr = self._read_pipes(stdout_r, stderr_r)
+            _, status = os.waitpid(pid, 0)
+        except BaseException:
+            # E.g. Ctrl-C: don't leave the child running, unreaped or holding our fds
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            for fd in (stdout_r, stderr_r):
+                try:
+                    os.close(fd)
+                except OSError:
+                    pass
+            raise
+        
+        encoding = locale.getpreferredencoding(False)
+        return subprocess.CompletedProcess(
+            command,
+            os.waitstatus_to_exitcode(status),
+            stdout=stdout.decode(encoding, errors='replace').replace('\r\n', '\n'),
+            stderr=stderr.decode(encoding, errors='replace').replace('\r\n', '\n')
+        )
+    
+    def _read_pipes(self, stdout_fd: int, stderr_fd: int) -> Tuple[bytes, bytes]:
+        """Drain two pipes until both reach EOF, then close them"""
+        buffers = {stdout_fd: bytearray(), stderr_fd: bytearray()}
+        # One read buffer reused for every chunk instead of a new bytes object per read
+        chunk = memoryview(bytearray(65536))
+        with selectors.DefaultSelector() as selector:
+            for fd in buffers:
+                selector.register(fd, selectors.EVENT_READ)
+            while selector.get_map():
+                for key, _ in selector.select():
+                    size = os.readv(key.fd, [chunk])
+                    if size:
+                        buffers[key.fd] += chunk[:size]
+                    else:
+                        selector.unregister(key.fd)
+                        os.close(key.fd)
+        return bytes(buffers[stdout_fd]), bytes(buffers[stderr_fd])
+    
+    def stream_command(self, command: List[str], **kwargs) -> Iterator[str]:
+        """Run a command and yield its stdout line by line as it is produced"""
+        self.logger.debug(f"Running command: {' '.join(command)}")
+        proc = subprocess.Popen(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            **kwargs
+        )
+        try:
+            yield from proc.stdout
+        except BaseException:
+            # The consumer stopped early (GeneratorExit) or we were interrupted;
+            # don't leave the child blocked on a full pipe
+            proc.kill()
+            raise
+        finally:
+            # At EOF the child may still be exiting; just wait for it
+            proc.stdout.close()
+            proc.wait()
+        
+        if proc.returncode != 0:
+            self.logger.debug(f"Command exited with code {proc.returncode}: {' '.join(command)}")
+    
     def check_command_exists(self, command: str) -> bool:
         """Check if a command exists in the system PATH"""
         return shutil.which(command) is not None
@@ -0,0 +1,238 @@
+"""
+Privileged pacman helper for Batman package manager
+
+Started once through sudo, the helper listens on a Unix domain socket and
+runs whitelisted pacman transactions as root on behalf of the user that
+launched it, so each install/update/remove doesn't pay for sudo again.
+
+Run directly as a script (it only uses the standard library):
+    sudo python3 pacman_helper.py --owner-uid 1000
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+import socket
+import stat
+import struct
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+# Fixed, root-owned location; the helper never takes a socket path from the user
+SOCKET_DIR = Path('/run/batman')
+IDLE_TIMEOUT = 600          # seconds without a request before the helper exits
+START_TIMEOUT = 5           # seconds to wait for a freshly started helper
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+_LENGTH = struct.Struct('!I')
+_UCRED = struct.Struct('3i')
+
+# Only these transactions may be requested, with these flags
+ALLOWED_OPERATIONS = {'-S', '-Sy', '-Su', '-Syu', '-R'}
+ALLOWED_FLAGS = {'--noconfirm', '--needed', '--cascade', '--recursive'}
+_PACKAGE_NAME_RE = re.compile(r'^[a-zA-Z0-9][a-zA-Z0-9._+-]*$')
+
+def socket_path_for(uid: int) -> Path:
+    """Socket of the helper serving the given user"""
+    return SOCKET_DIR / f'pacman-{uid}.sock'
+
+def send_message(sock: socket.socket, message: Dict[str, Any]):
+    """Send a length-prefixed JSON message"""
+    payload = json.dumps(message).encode()
+    sock.sendall(_LENGTH.pack(len(payload)) + payload)
+
+def recv_message(sock: socket.socket) -> Dict[str, Any]:
+    """Receive a length-prefixed JSON message"""
+    length, = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    if length > MAX_MESSAGE_SIZE:
+        raise ValueError(f"Message too large: {length} bytes")
+    return json.loads(_recv_exactly(sock, length))
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly size bytes from the socket"""
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 65536))
+        if not chunk:
+            raise ConnectionError("Connection closed by peer")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+def validate_arguments(args: List[str]) -> bool:
+    """Check that a request is a whitelisted pacman transaction on plain package names"""
+    if not args or args[0] not in ALLOWED_OPERATIONS:
+        return False
+    return all(arg in ALLOWED_FLAGS or _PACKAGE_NAME_RE.match(arg) for arg in args[1:])
+
+class PacmanHelperClient:
+    """Client side of the privileged helper protocol"""
+    
+    def __init__(self):
+        self.socket_path = str(socket_path_for(os.getuid()))
+    
+    def is_running(self) -> bool:
+        """Check whether a helper is listening on the socket"""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.connect(self.socket_path)
+            return True
+        except OSError:
+            return False
+    
+    def start(self) -> bool:
+        """Start the helper through sudo, prompting for credentials once"""
+        if self.is_running():
+            return True
+        
+        # Authenticate interactively, then launch the helper non-interactively
+        if subprocess.run(['sudo', '-v']).returncode != 0:
+            return False
+        
+        subprocess.Popen(
+            ['sudo', '-n', sys.executable, str(Path(__file__).resolve()),
+             '--owner-uid', str(os.getuid())],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True
+        )
+        
+        deadline = time.monotonic() + START_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.is_running():
+                return True
+            time.sleep(0.1)
+        return False
+    
+    def run(self, args: List[str]) -> subprocess.CompletedProcess:
+        """Run `pacman <args>` as root through the helper"""
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.socket_path)
+            send_message(sock, {'args': args})
+            response = recv_message(sock)
+        
+        if 'error' in response:
+            raise RuntimeError(f"pacman helper refused request: {response['error']}")
+        
+        return subprocess.CompletedProcess(
+            ['pacman'] + args,
+            response['returncode'],
+            stdout=response['stdout'],
+            stderr=response['stderr']
+        )
+
+class PacmanHelperServer:
+    """Root side: accepts requests from a single user and runs pacman"""
+    
+    def __init__(self, owner_uid: int, idle_timeout: int = IDLE_TIMEOUT):
+        self.socket_path = socket_path_for(owner_uid)
+        self.owner_uid = owner_uid
+        self.idle_timeout = idle_timeout
+        self.pacman = shutil.which('pacman')
+    
+    def serve(self):
+        """Serve requests until no request arrives for idle_timeout seconds"""
+        if self.pacman is None:
+            raise RuntimeError("pacman not found")
+        
+        self._prepare_socket_dir()
+        self._remove_stale_socket()
+        
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(str(self.socket_path))
+            # Only the owning user may connect
+            os.chown(self.socket_path, self.owner_uid, -1)
+            os.chmod(self.socket_path, 0o600)
+            server.listen()
+            server.settimeout(self.idle_timeout)
+            
+            try:
+                while True:
+                    try:
+                        conn, _ = server.accept()
+                    except socket.timeout:
+                        break
+                    with conn:
+                        self._handle(conn)
+            finally:
+                self.socket_path.unlink(missing_ok=True)
+    
+    def _prepare_socket_dir(self):
+        """Create SOCKET_DIR if needed and make sure only root can modify it"""
+        try:
+            os.mkdir(SOCKET_DIR, 0o755)
+        except FileExistsError:
+            pass
+        
+        # lstat, so a symlink planted in place of the directory is refused
+        st = os.lstat(SOCKET_DIR)
+        if not stat.S_ISDIR(st.st_mode) or st.st_uid != 0:
+            raise RuntimeError(f"{SOCKET_DIR} is not a root-owned directory")
+        if st.st_mode & 0o022:
+            os.chmod(SOCKET_DIR, 0o755)
+    
+    def _remove_stale_socket(self):
+        """Remove a socket left by an earlier helper; refuse anything else"""
+        try:
+            st = os.lstat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(st.st_mode):
+            raise RuntimeError(f"{self.socket_path} exists and is not a socket")
+        os.unlink(self.socket_path)
+    
+    def _handle(self, conn: socket.socket):
+        """Handle one request on an accepted connection"""
+        try:
+            conn.settimeout(None)
+            if not self._peer_allowed(conn):
+                send_message(conn, {'error': 'permission denied'})
+                return
+            
+            args = recv_message(conn).get('args')
+            if not isinstance(args, list) or not validate_arguments(args):
+                send_message(conn, {'error': f'operation not allowed: {args}'})
+                return
+            
+            result = subprocess.run(
+                [self.pacman] + args,
+                stdin=subprocess.DEVNULL,
+                capture_output=True,
+                text=True
+            )
+            send_message(conn, {
+                'returncode': result.returncode,
+                'stdout': result.stdout,
+                'stderr': result.stderr
+            })
+        except ConnectionError:
+            # Clients probe with is_running() by connecting and closing straight away
+            pass
+        except (OSError, ValueError) as e:
+            print(f"pacman helper: {e}", file=sys.stderr)
+    
+    def _peer_allowed(self, conn: socket.socket) -> bool:
+        """Check the connecting process's uid with SO_PEERCRED"""
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _UCRED.size)
+        _, uid, _ = _UCRED.unpack(creds)
+        return uid in (self.owner_uid, 0)
+
+def main():
+    parser = argparse.ArgumentParser(description="Batman privileged pacman helper")
+    parser.add_argument('--owner-uid', type=int, required=True)
+    parser.add_argument('--idle-timeout', type=int, default=IDLE_TIMEOUT)
+    args = parser.parse_args()
+    
+    if os.geteuid() != 0:
+        sys.exit("pacman helper must run as root")
+    
+    PacmanHelperServer(args.owner_uid, args.idle_timeout).serve()
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -2,12 +2,40 @@
 Pacman package manager for Batman package manager (Arch Linux)
 """
 
-import json
+import asyncio
+import os
 import re
-from typing import List, Dict, Optional, Any
+import subprocess
+from typing import List, Dict, Optional, Any, Iterator
 from pathlib import Path
 
 from .base_manager import PackageManagerBase
+from .pacman_helper import PacmanHelperClient
+
+try:
+    import pyalpm
+except ImportError:
+    # Optional libalpm bindings; without them we parse pacman's output
+    pyalpm = None
+
+PACMAN_ROOT = '/'
+PACMAN_DBPATH = '/var/lib/pacman'
+PACMAN_CONF = '/etc/pacman.conf'
+
+# Local database queries need neither repositories nor hooks from pacman.conf
+_LOCAL_QUERY_OPTIONS = ('--config', '/dev/null', '--dbpath', PACMAN_DBPATH, '--noprogressbar')
+
+_PACMAN_NAME_RE = re.compile(r'^[a-zA-Z0-9][a-zA-Z0-9._+-]*$')
+# Package header line of `pacman -Ss` output
+_PACMAN_SEARCH_RE = re.compile(r'^([^/]+)/(\S+)\s+(\S+)')
+_PACMAN_CONF_SECTION_RE = re.compile(r'^\s*\[([^\]]+)\]')
+
+# `pacman -Qi`/`-Si` fields we report, mapped to their normalized keys up front
+_PACMAN_INFO_FIELDS = frozenset({
+    'Name', 'Version', 'Description', 'Architecture', 'URL',
+    'Repository', 'Packager', 'Installed Size', 'Depends On'
+})
+_PACMAN_INFO_KEYS = {field: field.lower().replace(' ', '_') for field in _PACMAN_INFO_FIELDS}
 
 class PacmanManager(PackageManagerBase):
     """Package manager for Arch Linux pacman packages"""
@@ -15,10 +43,18 @@ class PacmanManager(PackageManagerBase):
     def __init__(self, config: Dict[str, Any], logger):
         super().__init__(config, logger)
         self.pacman_cmd = 'pacman'
+        self._available: Optional[bool] = None
+        self._installed_cache: Optional[Dict[str, str]] = None
+        self._alpm_handle = None
+        # Optional long-lived root helper that saves a sudo round-trip per transaction
+        self.use_privileged_helper = config.get('use_privileged_helper', False)
+        self._helper: Optional[PacmanHelperClient] = None
     
     def is_available(self) -> bool:
         """Check if pacman is available on the system"""
-        return self.check_command_exists('pacman')
+        if self._available is None:
+            self._available = self.check_command_exists('pacman')
+        return self._available
     
     def install(self, package_name: str, version: Optional[str] = None, **kwargs) -> bool:
         """Install a package using pacman"""
@@ -34,17 +70,26 @@ class PacmanManager(PackageManagerBase):
                 self.logger.warning(f"Pacman doesn't support installing specific versions. "
                                   f"Installing latest version of {package_name}")
             
+            # With --needed an up-to-date package is a no-op, so ask pacman
+            # (without root) what it would install and skip sudo if nothing
+            needed = kwargs.get('needed', True)
+            if needed and self._is_satisfied(package_name):
+                self.logger.info(f"{package_name} is already installed and up to date")
+                self.logger.command_success("install", package_name)
+                return True
+            
             # Build install command
-            install_cmd = ['sudo', 'pacman', '-S', '--noconfirm']
+            install_cmd = ['-S', '--noconfirm']
             
             # Add needed flag if requested
-            if kwargs.get('needed', True):
+            if needed:
                 install_cmd.append('--needed')
             
             install_cmd.append(package_name)
             
             # Run installation
-            result = self.run_command(install_cmd)
+            result = self._run_privileged(install_cmd)
+            self._invalidate_installed_cache()
             
             if result.returncode == 0:
                 self.logger.command_success("install", package_name)
@@ -68,8 +113,9 @@ class PacmanManager(PackageManagerBase):
                 return self.install(package_name, **kwargs)
             
             # Upgrade specific package
-            update_cmd = ['sudo', 'pacman', '-S', '--noconfirm', package_name]
-            result = self.run_command(update_cmd)
+            update_cmd = ['-S', '--noconfirm', package_name]
+            result = self._run_privileged(update_cmd)
+            self._invalidate_installed_cache()
             
             if result.returncode == 0:
                 self.logger.command_success("update", package_name)
@@ -87,7 +133,7 @@ class PacmanManager(PackageManagerBase):
         try:
             self.logger.command_start("remove", package_name, "pacman")
             
-            remove_cmd = ['sudo', 'pacman', '-R', '--noconfirm']
+            remove_cmd = ['-R', '--noconfirm']
             
             # Add cascade option if requested
             if kwargs.get('cascade', False):
@@ -99,7 +145,8 @@ class PacmanManager(PackageManagerBase):
             
             remove_cmd.append(package_name)
             
-            result = self.run_command(remove_cmd)
+            result = self._run_privileged(remove_cmd)
+            self._invalidate_installed_cache()
             
             if result.returncode == 0:
                 self.logger.command_success("remove", package_name)
@@ -116,43 +163,32 @@ class PacmanManager(PackageManagerBase):
         """Search for packages"""
         try:
             search_cmd = ['pacman', '-Ss', query]
-            result = self.run_command(search_cmd)
             
-            if result.returncode == 0:
-                packages = []
-                lines = result.stdout.split('\n')
-                
-                i = 0
-                while i < len(lines):
-                    line = lines[i].strip()
-                    if not line:
-                        i += 1
-                        continue
-                    
-                    # Parse package info line (format: repo/name version [group] (size))
-                    match = re.match(r'^([^/]+)/([^\s]+)\s+([^\s]+)', line)
-                    if match:
-                        repo, name, version = match.groups()
-                        
-                        # Get description from next line if available
-                        description = ""
-                        if i + 1 < len(lines) and lines[i + 1].startswith('    '):
-                            description = lines[i + 1].strip()
-                            i += 1
-                        
-                        packages.append({
-                            'name': name,
-                            'version': version,
-                            'description': description,
-                            'repository': repo,
-                            'manager': 'pacman'
-                        })
-                    
-                    i += 1
+            packages = []
+            current = None
+            for line in self.stream_command(search_cmd):
+                # Description lines are indented under their package header
+                if line.startswith('    '):
+                    if current is not None and not current['description']:
+                        current['description'] = line.strip()
+                    continue
                 
-                return packages
-            else:
-                return []
+                # Parse package info line (format: repo/name version [group] (size))
+                match = _PACMAN_SEARCH_RE.match(line.strip())
+                if match:
+                    repo, name, version = match.groups()
+                    current = {
+                        'name': name,
+                        'version': version,
+                        'description': "",
+                        'repository': repo,
+                        'manager': 'pacman'
+                    }
+                    packages.append(current)
+                else:
+                    current = None
+            
+            return packages
                 
         except Exception as e:
             self.logger.error(f"Search failed: {e}")
@@ -161,76 +197,64 @@ class PacmanManager(PackageManagerBase):
     def list_installed(self, **kwargs) -> List[Dict[str, Any]]:
         """List installed packages"""
         try:
-            list_cmd = ['pacman', '-Q']
-            
-            # Add explicit packages only flag if requested
-            if kwargs.get('explicit', False):
-                list_cmd.append('-e')
-            
-            result = self.run_command(list_cmd)
-            
-            if result.returncode == 0:
-                packages = []
-                for line in result.stdout.split('\n'):
-                    line = line.strip()
-                    if line:
-                        parts = line.split(' ', 1)
-                        if len(parts) == 2:
-                            name, version = parts
-                            packages.append({
-                                'name': name,
-                                'version': version,
-                                'manager': 'pacman'
-                            })
-                
-                return packages
-            else:
-                return []
-                
+            return list(self.iter_installed(**kwargs))
         except Exception as e:
             self.logger.error(f"Failed to list packages: {e}")
             return []
     
+    def iter_installed(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield installed packages as they are read from the local database"""
+        handle = self._get_alpm_handle()
+        if handle is not None:
+            explicit_only = kwargs.get('explicit', False)
+            for pkg in handle.get_localdb().pkgcache:
+                if explicit_only and pkg.reason != pyalpm.PKG_REASON_EXPLICIT:
+                    continue
+                yield {
+                    'name': pkg.name,
+                    'version': pkg.version,
+                    'manager': 'pacman'
+                }
+            return
+        
+        list_cmd = ['pacman', '-Q', *_LOCAL_QUERY_OPTIONS]
+        
+        # Add explicit packages only flag if requested
+        if kwargs.get('explicit', False):
+            list_cmd.append('-e')
+        
+        for line in self.stream_command(list_cmd):
+            parts = line.strip().split(' ', 1)
+            if len(parts) == 2:
+                name, version = parts
+                yield {
+                    'name': name,
+                    'version': version,
+                    'manager': 'pacman'
+                }
+    
     def get_package_info(self, package_name: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a package"""
         try:
-            # Try to get info for installed package first
-            info_cmd = ['pacman', '-Qi', package_name]
-            result = self.run_command(info_cmd, check=False)
+            handle = self._get_alpm_handle()
+            if handle is not None:
+                pkg = self._find_alpm_package(handle, package_name)
+                return self._alpm_package_info(pkg) if pkg else None
+            
+            # Query the local database only for installed packages, otherwise
+            # go straight to the repositories
+            if self.is_installed(package_name):
+                info_cmd = ['pacman', '-Qi', *_LOCAL_QUERY_OPTIONS, package_name]
+                result = self.run_command(info_cmd, check=False)
+            else:
+                result = None
             
-            if result.returncode != 0:
-                # If not installed, try to get info from repositories
+            if result is None or result.returncode != 0:
                 info_cmd = ['pacman', '-Si', package_name]
                 result = self.run_command(info_cmd, check=False)
             
             if result.returncode == 0:
-                info = {}
-                for line in result.stdout.split('\n'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        key = key.strip().lower().replace(' ', '_')
-                        value = value.strip()
-                        info[key] = value
-                
-                # Parse dependencies
-                dependencies = []
-                if 'depends_on' in info:
-                    deps = info['depends_on']
-                    if deps and deps != 'None':
-                        dependencies = [dep.strip() for dep in deps.split()]
-                
-                return {
-                    'name': info.get('name', package_name),
-                    'version': info.get('version', 'unknown'),
-                    'description': info.get('description', ''),
-                    'architecture': info.get('architecture', ''),
-                    'url': info.get('url', ''),
-                    'repository': info.get('repository', ''),
-                    'packager': info.get('packager', ''),
-                    'install_size': info.get('installed_size', ''),
-                    'dependencies': dependencies,
-                    'manager': 'pacman'
-                }
+                return self._parse_package_info(result.stdout, package_name)
             else:
                 return None
                 
@@ -238,27 +262,158 @@ class PacmanManager(PackageManagerBase):
             self.logger.error(f"Failed to get package info: {e}")
             return None
     
+    def _parse_package_info(self, output: str, package_name: str) -> Dict[str, Any]:
+        """Parse `pacman -Qi`/`pacman -Si` output for a single package"""
+        info = {}
+        for line in output.split('\n'):
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+            # Field names are padded on the right; wrapped continuation lines don't match
+            key = _PACMAN_INFO_KEYS.get(key.rstrip())
+            if key:
+                info[key] = value.strip()
+        
+        # Parse dependencies
+        dependencies = []
+        if 'depends_on' in info:
+            deps = info['depends_on']
+            if deps and deps != 'None':
+                dependencies = [dep.strip() for dep in deps.split()]
+        
+        return {
+            'name': info.get('name', package_name),
+            'version': info.get('version', 'unknown'),
+            'description': info.get('description', ''),
+            'architecture': info.get('architecture', ''),
+            'url': info.get('url', ''),
+            'repository': info.get('repository', ''),
+            'packager': info.get('packager', ''),
+            'install_size': info.get('installed_size', ''),
+            'dependencies': dependencies,
+            'manager': 'pacman'
+        }
+    
+    def get_package_info_many(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get detailed information about several packages concurrently"""
+        if self._get_alpm_handle() is not None:
+            # In-process libalpm lookups need no subprocesses to overlap
+            return super().get_package_info_many(package_names)
+        
+        try:
+            return asyncio.run(self._get_package_info_many_async(package_names))
+        except Exception as e:
+            self.logger.error(f"Failed to get package info: {e}")
+            return {name: None for name in package_names}
+    
+    async def _get_package_info_many_async(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Run one pacman info query per package, at most max_parallel_jobs at a time"""
+        installed = self._ensure_installed_cache()
+        semaphore = asyncio.Semaphore(self.max_parallel_jobs)
+        
+        async def fetch(package_name: str) -> Optional[Dict[str, Any]]:
+            commands = [['pacman', '-Si', package_name]]
+            if package_name in installed:
+                commands.insert(0, ['pacman', '-Qi', *_LOCAL_QUERY_OPTIONS, package_name])
+            
+            async with semaphore:
+                for command in commands:
+                    self.logger.debug(f"Running command: {' '.join(command)}")
+                    proc = await asyncio.create_subprocess_exec(
+                        *command,
+                        stdout=asyncio.subprocess.PIPE,
+                        stderr=asyncio.subprocess.DEVNULL
+                    )
+                    stdout, _ = await proc.communicate()
+                    if proc.returncode == 0:
+                        return self._parse_package_info(stdout.decode(), package_name)
+            return None
+        
+        results = await asyncio.gather(*(fetch(name) for name in package_names))
+        return dict(zip(package_names, results))
+    
+    def _ensure_installed_cache(self) -> Dict[str, str]:
+        """Build the installed package index from a single pacman -Q pass"""
+        if self._installed_cache is None:
+            self._installed_cache = {pkg['name']: pkg['version'] for pkg in self.iter_installed()}
+        
+        return self._installed_cache
+    
+    def _invalidate_installed_cache(self):
+        """Drop the installed package index after the local database changed"""
+        self._installed_cache = None
+        # libalpm caches database contents, so reopen it on next use
+        if self._alpm_handle:
+            self._alpm_handle = None
+    
+    def _get_alpm_handle(self):
+        """Open libalpm once through pyalpm, or return None to use the pacman CLI"""
+        if pyalpm is None or self._alpm_handle is False:
+            return None
+        
+        if self._alpm_handle is None:
+            try:
+                handle = pyalpm.Handle(PACMAN_ROOT, PACMAN_DBPATH)
+                for repo in self._configured_repositories():
+                    handle.register_syncdb(repo, pyalpm.SIG_DATABASE_OPTIONAL)
+                self._alpm_handle = handle
+            except Exception as e:
+                self.logger.debug(f"Could not open libalpm databases: {e}")
+                self._alpm_handle = False
+                return None
+        
+        return self._alpm_handle
+    
+    def _configured_repositories(self) -> List[str]:
+        """List sync repositories in pacman.conf order"""
+        repos = []
+        try:
+            with open(PACMAN_CONF, 'r') as f:
+                for line in f:
+                    match = _PACMAN_CONF_SECTION_RE.match(line)
+                    if match and match.group(1) != 'options':
+                        repos.append(match.group(1))
+        except OSError:
+            # Fall back to whatever sync databases have been downloaded
+            repos = sorted(db.stem for db in (Path(PACMAN_DBPATH) / 'sync').glob('*.db'))
+        return repos
+    
+    def _find_alpm_package(self, handle, package_name: str):
+        """Look a package up in the local database, then the sync databases"""
+        pkg = handle.get_localdb().get_pkg(package_name)
+        if pkg is None:
+            for db in handle.get_syncdbs():
+                pkg = db.get_pkg(package_name)
+                if pkg is not None:
+                    break
+        return pkg
+    
+    def _alpm_package_info(self, pkg) -> Dict[str, Any]:
+        """Convert a pyalpm package into the get_package_info dictionary"""
+        return {
+            'name': pkg.name,
+            'version': pkg.version,
+            'description': pkg.desc or '',
+            'architecture': pkg.arch or '',
+            'url': pkg.url or '',
+            'repository': pkg.db.name if pkg.db else '',
+            'packager': pkg.packager or '',
+            'install_size': f"{pkg.isize / 1024 / 1024:.2f} MiB",
+            'dependencies': list(pkg.depends),
+            'manager': 'pacman'
+        }
+    
     def is_installed(self, package_name: str) -> bool:
         """Check if a package is installed"""
         try:
-            check_cmd = ['pacman', '-Q', package_name]
-            result = self.run_command(check_cmd, check=False)
-            return result.returncode == 0
+            return package_name in self._ensure_installed_cache()
         except:
             return False
     
     def get_version(self, package_name: str) -> Optional[str]:
         """Get installed version of a package"""
         try:
-            version_cmd = ['pacman', '-Q', package_name]
-            result = self.run_command(version_cmd, check=False)
-            
-            if result.returncode == 0:
-                parts = result.stdout.strip().split(' ', 1)
-                if len(parts) == 2:
-                    return parts[1]
-            
-            return None
+            return self._ensure_installed_cache().get(package_name)
         except:
             return None
     
@@ -267,18 +422,43 @@ class PacmanManager(PackageManagerBase):
         try:
             self.logger.info("Updating all packages with pacman...")
             
-            # First update package database
-            sync_cmd = ['sudo', 'pacman', '-Sy']
-            self.run_command(sync_cmd)
+            check_result = None
+            if self.check_command_exists('checkupdates'):
+                # checkupdates syncs a private copy of the databases without root;
+                # exit code 2 means nothing to upgrade
+                # (output lines are "name old -> new")
+                check_result = self.run_command(['checkupdates'], check=False)
+                if check_result.returncode == 2:
+                    self.logger.info("All pacman packages are up to date")
+                    return []
+                if check_result.returncode != 0:
+                    # Any other code means checkupdates itself failed; plan with pacman instead
+                    self.logger.debug(f"checkupdates failed ({check_result.returncode}): {check_result.stderr.strip()}")
+                    check_result = None
+            
+            if check_result is not None:
+                planned = self._parse_name_lines(check_result.stdout)
+                upgrade_cmd = ['-Syu', '--noconfirm']
+            else:
+                # First update package database
+                sync_cmd = ['-Sy']
+                self._run_privileged(sync_cmd)
+                
+                # Plan the upgrade in user space; only escalate again if it is non-empty
+                plan_cmd = ['pacman', '-Sup', '--print-format', '%n %v']
+                plan_result = self.run_command(plan_cmd, check=False)
+                planned = self._parse_name_lines(plan_result.stdout)
+                if not planned:
+                    self.logger.info("All pacman packages are up to date")
+                    return []
+                upgrade_cmd = ['-Su', '--noconfirm']
             
             # Then upgrade all packages
-            upgrade_cmd = ['sudo', 'pacman', '-Su', '--noconfirm']
-            result = self.run_command(upgrade_cmd)
+            result = self._run_privileged(upgrade_cmd)
+            self._invalidate_installed_cache()
             
             if result.returncode == 0:
-                # Get list of upgraded packages from output
-                # This is simplified - in reality you'd parse the output
-                return ["system-upgrade"]
+                return planned
             else:
                 return []
                 
@@ -286,6 +466,60 @@ class PacmanManager(PackageManagerBase):
             self.logger.error(f"Failed to update all packages: {e}")
             return []
     
+    def _run_privileged(self, args: List[str], check: bool = True) -> subprocess.CompletedProcess:
+        """Run `pacman <args>` as root, through the helper when enabled, else via sudo"""
+        helper = self._get_helper()
+        if helper is not None:
+            try:
+                self.logger.debug(f"Running command via pacman helper: pacman {' '.join(args)}")
+                result = helper.run(args)
+                if check:
+                    result.check_returncode()
+                return result
+            except (OSError, RuntimeError, ValueError, KeyError) as e:
+                # Includes malformed replies; sudo still works
+                self.logger.debug(f"pacman helper unavailable, falling back to sudo: {e}")
+                self._helper = None
+        
+        return self.run_command(['sudo', 'pacman'] + args, check=check)
+    
+    def _get_helper(self) -> Optional[PacmanHelperClient]:
+        """Connect to (or start) the privileged helper on first use"""
+        if not self.use_privileged_helper:
+            return None
+        
+        if self._helper is None:
+            helper = PacmanHelperClient()
+            if not helper.start():
+                self.logger.debug("Could not start pacman helper, using sudo")
+                self.use_privileged_helper = False
+                return None
+            self._helper = helper
+        
+        return self._helper
+    
+    def _parse_name_lines(self, output: str) -> List[str]:
+        """Collect package names from "name version..." lines, skipping pacman chatter"""
+        names = []
+        for line in output.split('\n'):
+            parts = line.split()
+            if len(parts) >= 2 and not line.startswith('::'):
+                names.append(parts[0])
+        return names
+    
+    def _is_satisfied(self, package_name: str) -> bool:
+        """Check without root whether `pacman -S --needed` would have nothing to do"""
+        try:
+            # Resolves the target against the sync databases exactly like -S,
+            # printing each package it would install or upgrade
+            result = self.run_command(
+                ['pacman', '-Sp', '--needed', '--noconfirm', '--print-format', '%n', package_name],
+                check=False
+            )
+            return result.returncode == 0 and not result.stdout.strip()
+        except Exception:
+            return False
+    
     def normalize_package_name(self, name: str) -> str:
         """Normalize package name for pacman"""
         # Pacman package names are generally lowercase
@@ -298,4 +532,4 @@ class PacmanManager(PackageManagerBase):
         
         # Additional pacman-specific validation
         # Package names should not start with hyphen and should be alphanumeric with hyphens
-        return bool(re.match(r'^[a-zA-Z0-9][a-zA-Z0-9._+-]*$', package_name)) 
\ No newline at end of file
+        return bool(_PACMAN_NAME_RE.match(package_name)) 
\ No newline at end of file
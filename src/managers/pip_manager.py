@@ -2,20 +2,167 @@
 Pip package manager for Batman package manager
 """
 
-import json
+import asyncio
+import functools
+import gzip
+import os
 import re
+import shutil
+import site
+import subprocess
 import sys
-from typing import List, Dict, Optional, Any
+import sysconfig
+import threading
+import types
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import List, Dict, Optional, Any, Tuple, Iterator
 from pathlib import Path
 
 from .base_manager import PackageManagerBase
+from .pip_worker import PipWorkerClient
+
+try:
+    import orjson as _json
+except ImportError:
+    # Optional; without it pip's and PyPI's JSON is parsed by the standard library
+    import json as _json
+
+try:
+    import ijson
+except ImportError:
+    # Optional; without it pip's JSON output is parsed once pip has finished
+    ijson = None
+
+try:
+    from packaging.requirements import Requirement
+except ImportError:
+    # Optional; without it environment markers on requirements are not evaluated
+    Requirement = None
+
+try:
+    import requests
+except ImportError:
+    # Optional; without it PyPI is queried through urllib, one connection per request
+    requests = None
+
+try:
+    import aiohttp
+except ImportError:
+    # Optional; without it search_many falls back to a thread pool
+    aiohttp = None
+
+try:
+    import uvloop
+except ImportError:
+    # Optional; without it search_many_async runs on the default asyncio loop
+    uvloop = None
+
+PYPI_JSON_URL = "https://pypi.org/pypi/{}/json"
+PYPI_TIMEOUT = 10
+PYPI_CACHE_SIZE = 256
+PIP_SHOW_CACHE_SIZE = 1024
+
+# Runs of separators that PEP 503 treats as equivalent in distribution names
+_DIST_NAME_SEPARATORS_RE = re.compile(r'[-_.]+')
+# Record separator used by `pip show` when given several packages
+_PIP_SHOW_SEPARATOR_RE = re.compile(r'^---$', re.MULTILINE)
+# Distribution name at the start of a Requires-Dist entry
+_REQUIREMENT_NAME_RE = re.compile(r'^\s*([A-Za-z0-9][A-Za-z0-9._-]*)')
+# PEP 668 error reported by pip when the interpreter is managed by the OS
+_EXT_MANAGED_RE = re.compile(r'externally-managed-environment')
+# Requirements pip names when it can't find a matching distribution
+_PIP_UNRESOLVED_RE = re.compile(r'(?:satisfies the requirement|No matching distribution found for) (\S+)')
+
+# Common Python package name mappings for system packages
+_SYSTEM_MAPPINGS = types.MappingProxyType({
+    'numpy': 'python-numpy',
+    'scipy': 'python-scipy',
+    'matplotlib': 'python-matplotlib',
+    'pandas': 'python-pandas',
+    'requests': 'python-requests',
+    'flask': 'python-flask',
+    'django': 'python-django',
+    'sympy': 'python-sympy',
+    'pillow': 'python-pillow',
+    'pil': 'python-pillow',
+    'pyqt5': 'python-pyqt5',
+    'pyqt6': 'python-pyqt6',
+    'psutil': 'python-psutil',
+    'lxml': 'python-lxml',
+    'beautifulsoup4': 'python-beautifulsoup4',
+    'selenium': 'python-selenium',
+    'cryptography': 'python-cryptography',
+    'setuptools': 'python-setuptools',
+    'wheel': 'python-wheel',
+    'virtualenv': 'python-virtualenv',
+    'pytest': 'python-pytest',
+    'pylint': 'python-pylint',
+    'black': 'python-black',
+    'flake8': 'python-flake8',
+    'isort': 'python-isort',
+    'mypy': 'python-mypy',
+    'poetry': 'python-poetry',
+    'tox': 'python-tox',
+    'sphinx': 'python-sphinx',
+    'click': 'python-click',
+    'pyyaml': 'python-yaml',
+    'yaml': 'python-yaml',
+    'redis': 'python-redis',
+    'celery': 'python-celery',
+    'sqlalchemy': 'python-sqlalchemy',
+    'alembic': 'python-alembic',
+    'jinja2': 'python-jinja',
+    'markupsafe': 'python-markupsafe',
+    'werkzeug': 'python-werkzeug',
+    'twisted': 'python-twisted',
+    'tornado': 'python-tornado',
+    'aiohttp': 'python-aiohttp',
+    'fastapi': 'python-fastapi',
+})
+
+# System package managers (name, command) in order of preference
+_SYSTEM_PACKAGE_MANAGERS = (
+    ('pacman', 'pacman'),
+    ('apt', 'apt'),
+    ('yum', 'yum'),
+    ('dnf', 'dnf'),
+    ('brew', 'brew'),
+)
+
+# `Field: value` lines of `pip show` output
+_PIP_SHOW_RE = re.compile(r'^([\w-]+):[ \t]*(.*)$', re.MULTILINE)
+# `pip show` fields we report, mapped to their normalized keys up front
+_PIP_SHOW_FIELDS = frozenset({
+    'Name', 'Version', 'Summary', 'Author', 'Home-page', 'Location', 'Requires'
+})
+_PIP_SHOW_KEYS = {field: field.lower().replace('-', '_') for field in _PIP_SHOW_FIELDS}
 
 class PipManager(PackageManagerBase):
     """Package manager for Python pip packages"""
     
     def __init__(self, config: Dict[str, Any], logger):
         super().__init__(config, logger)
-        self.pip_cmd = self._find_pip_command()
+        # Resolved on first use so managers that are never used don't probe for pip
+        self._pip_cmd_cached: Optional[str] = None
+        self._pip_argv_cached: Optional[List[str]] = None
+        self.use_worker = config.get('use_worker', False)
+        self.externally_managed_strategy = config.get('externally_managed_strategy', 'prompt')
+        # None until started, False once the worker proved unusable
+        self._pip_worker = None
+        self._available: Optional[bool] = None
+        self._pip_installed_cache: Optional[Dict[str, Dict[str, Any]]] = None
+        self._pip_installed_stamp: Optional[Tuple[int, ...]] = None
+        # Keyed on (name, site-packages stamp) so out-of-band installs invalidate entries
+        self._cached_show = functools.lru_cache(maxsize=PIP_SHOW_CACHE_SIZE)(self._show_package)
+        # Install command prefixes only depend on a handful of flags
+        self._install_prefix = functools.lru_cache(maxsize=16)(self._build_install_prefix)
+        self._pip_inspect_supported: Optional[bool] = None
+        self._http = None
+        self._pypi_cache: Dict[Tuple[str, date], Optional[Dict[str, Any]]] = {}
+        self._pypi_cache_lock = threading.Lock()
     
     def _find_pip_command(self) -> str:
         """Find the appropriate pip command"""
@@ -23,25 +170,91 @@ class PipManager(PackageManagerBase):
         pip_commands = ['pip3', 'pip', 'python3 -m pip', 'python -m pip']
         
         for cmd in pip_commands:
-            if self.check_command_exists(cmd.split()[0]):
-                try:
-                    # Test the command
-                    result = self.run_command(cmd.split() + ['--version'], capture_output=True)
-                    if result.returncode == 0:
-                        self.logger.debug(f"Using pip command: {cmd}")
-                        return cmd
-                except:
-                    continue
+            # A PATH lookup is enough; a broken pip surfaces on its first real run
+            if shutil.which(cmd.split()[0]):
+                self.logger.debug(f"Using pip command: {cmd}")
+                return cmd
         
         raise RuntimeError("Could not find pip command")
     
+    @property
+    def pip_cmd(self) -> str:
+        """The pip command, found on first access"""
+        if self._pip_cmd_cached is None:
+            self._pip_cmd_cached = self._find_pip_command()
+        return self._pip_cmd_cached
+    
+    @property
+    def _pip_argv(self) -> List[str]:
+        """The pip command split into arguments"""
+        if self._pip_argv_cached is None:
+            self._pip_argv_cached = self.pip_cmd.split()
+        return self._pip_argv_cached
+    
+    def _get_pip_worker(self) -> Optional[PipWorkerClient]:
+        """Start the persistent pip worker on first use, if enabled"""
+        if not self.use_worker or self._pip_worker is False:
+            return None
+        
+        if self._pip_worker is None:
+            argv = self._pip_argv
+            # `python3 -m pip` names its interpreter; otherwise drive our own interpreter's pip
+            python = shutil.which(argv[0]) if argv[1:] == ['-m', 'pip'] else sys.executable
+            self._pip_worker = PipWorkerClient(python or sys.executable)
+            self._pip_worker.start()
+        return self._pip_worker
+    
+    def _run_pip(self, command: List[str], check: bool = True,
+                 log_output: bool = True) -> subprocess.CompletedProcess:
+        """Run a pip command in the persistent worker, or as a one-shot process"""
+        worker = self._get_pip_worker()
+        argv = self._pip_argv
+        if worker is not None and command[:len(argv)] == argv:
+            try:
+                self.logger.debug(f"Running in pip worker: {' '.join(command)}")
+                result = worker.run(command[len(argv):])
+            except (OSError, ValueError) as e:
+                self.logger.debug(f"pip worker failed, running pip directly: {e}")
+                # A worker that never answered (e.g. pip not importable) isn't restarted
+                self._pip_worker = None if worker.served else False
+                worker.close()
+            else:
+                if check:
+                    result.check_returncode()
+                return result
+        
+        return self.run_command(command, check=check, log_output=log_output)
+    
+    def _iter_pip_json(self, command: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yield the items of a JSON array printed by pip, parsed as it arrives when ijson is installed"""
+        if ijson is None or self._get_pip_worker() is not None:
+            result = self._run_pip(command, check=False)
+            if result.returncode == 0:
+                yield from _json.loads(result.stdout)
+            return
+        
+        self.logger.debug(f"Running command: {' '.join(command)}")
+        proc = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        try:
+            yield from ijson.items(proc.stdout, 'item')
+        except ijson.JSONError as e:
+            # pip prints nothing on failure, which ijson reports as incomplete JSON
+            self.logger.debug(f"Could not parse output of {' '.join(command)}: {e}")
+        except BaseException:
+            # The consumer stopped early (GeneratorExit) or we were interrupted;
+            # don't leave pip blocked on a full pipe
+            proc.kill()
+            raise
+        finally:
+            # Once the array is parsed pip may still be exiting; just wait for it
+            proc.stdout.close()
+            proc.wait()
+    
     def is_available(self) -> bool:
         """Check if pip is available on the system"""
-        try:
-            self._find_pip_command()
-            return True
-        except RuntimeError:
-            return False
+        if self._available is None:
+            self._available = bool(shutil.which('pip3') or shutil.which('pip'))
+        return self._available
     
     def install(self, package_name: str, version: Optional[str] = None, **kwargs) -> bool:
         """Install a Python package using pip"""
@@ -58,12 +271,68 @@ class PipManager(PackageManagerBase):
                 package_spec = package_name
             
             # Try installation with different strategies
-            return self._install_with_fallback(package_spec, **kwargs)
+            success = self._install_with_fallback(package_spec, **kwargs)
+            self._invalidate_installed_cache()
+            return success
                 
         except Exception as e:
             self.logger.command_error("install", str(e), package_name)
             return False
     
+    def install_many(self, specs: List[Tuple[str, Optional[str]]], **kwargs) -> List[str]:
+        """Install several Python packages with a single pip invocation"""
+        if not specs:
+            return []
+        
+        names = [name for name, _ in specs]
+        try:
+            self.logger.command_start("install", ', '.join(names), "pip")
+            
+            for name in names:
+                if not self.validate_package_name(name):
+                    raise ValueError(f"Invalid package name: {name}")
+            
+            package_specs = [f"{name}=={version}" if version else name for name, version in specs]
+            result = self._run_pip(self._build_install_command(package_specs, **kwargs), check=False)
+            
+            if result.returncode == 0:
+                self.logger.command_success("install", ', '.join(names))
+                return names
+            
+            if not _EXT_MANAGED_RE.search(result.stderr):
+                self.logger.command_error("install", f"Installation failed: {result.stderr}", ', '.join(names))
+                # A single bad package fails the whole batch; retry the rest together
+                return self._install_without_unresolved(specs, result.stderr, **kwargs)
+            
+            # pip refused the whole batch; fall back to the per-package handler
+            return [
+                name for name, package_spec in zip(names, package_specs)
+                if self._handle_externally_managed_error(package_spec, **kwargs)
+            ]
+        
+        except Exception as e:
+            self.logger.command_error("install", str(e), ', '.join(names))
+            return []
+        finally:
+            self._invalidate_installed_cache()
+    
+    def _install_without_unresolved(self, specs: List[Tuple[str, Optional[str]]], stderr: str,
+                                    **kwargs) -> List[str]:
+        """Retry a failed batch in one pip run, leaving out the requirements pip could not resolve"""
+        unresolved = set()
+        for requirement in _PIP_UNRESOLVED_RE.findall(stderr):
+            match = _REQUIREMENT_NAME_RE.match(requirement)
+            if match:
+                unresolved.add(self._normalize_dist_name(match.group(1)))
+        
+        remaining = [spec for spec in specs if self._normalize_dist_name(spec[0]) not in unresolved]
+        # Nothing to drop (or nothing left) means the batch can't succeed on a retry
+        if not remaining or len(remaining) == len(specs):
+            return []
+        
+        self.logger.info(f"Retrying without {', '.join(sorted(unresolved))}...")
+        return self.install_many(remaining, **kwargs)
+    
     def _install_with_fallback(self, package_spec: str, **kwargs) -> bool:
         """Install with fallback strategies for externally-managed-environment"""
         package_name = package_spec.split('=')[0].split('@')[0]
@@ -78,49 +347,79 @@ class PipManager(PackageManagerBase):
     def _try_user_install(self, package_spec: str, **kwargs) -> bool:
         """Try standard user installation"""
         try:
-            # Build install command
-            install_cmd = self.pip_cmd.split() + ['install']
-            
-            # Add user flag if not running as root and not in virtual environment
-            if not kwargs.get('system_wide', False) and not self._in_virtual_env():
-                install_cmd.append('--user')
-            
-            # Add upgrade flag if requested
-            if kwargs.get('upgrade', False):
-                install_cmd.append('--upgrade')
-            
-            # Add target directory if specified
-            target_dir = kwargs.get('target', self.install_dir)
-            if target_dir and target_dir != self.install_dir:
-                install_cmd.extend(['--target', str(target_dir)])
-            
-            install_cmd.append(package_spec)
-            
-            # Run installation
-            result = self.run_command(install_cmd, check=False)
-            
-            if result.returncode == 0:
-                package_name = package_spec.split('=')[0].split('@')[0]
-                self.logger.command_success("install", package_name)
-                return True
-            
-            # Check if it's the externally-managed-environment error
-            if "externally-managed-environment" in result.stderr:
-                return False  # Will trigger fallback handling
-            else:
-                # Some other error
-                self.logger.command_error("install", f"Installation failed: {result.stderr}", package_name)
-                return False
-                
+            package_name = package_spec.split('=')[0].split('@')[0]
+            return self._do_install(self._build_install_command([package_spec], **kwargs), package_name)
         except Exception as e:
             self.logger.debug(f"User install attempt failed: {e}")
             return False
     
+    def _do_install(self, install_cmd: List[str], package_name: str) -> bool:
+        """Run a prepared pip install command and report the outcome"""
+        result = self._run_pip(install_cmd, check=False)
+        
+        if result.returncode == 0:
+            self.logger.command_success("install", package_name)
+            return True
+        
+        # Check if it's the externally-managed-environment error
+        if _EXT_MANAGED_RE.search(result.stderr):
+            return False  # Will trigger fallback handling
+        
+        # Some other error
+        self.logger.command_error("install", f"Installation failed: {result.stderr}", package_name)
+        return False
+    
+    def _build_install_command(self, package_specs: List[str], **kwargs) -> List[str]:
+        """Build a `pip install` command for one or more package specifications"""
+        # Add user flag if not running as root and not in virtual environment
+        user = not kwargs.get('system_wide', False) and not self._in_virtual_env
+        
+        # Add target directory if specified
+        target_dir = kwargs.get('target', self.install_dir)
+        target = str(target_dir) if target_dir and target_dir != self.install_dir else None
+        
+        prefix = self._install_prefix(
+            user,
+            bool(kwargs.get('upgrade', False)),
+            bool(kwargs.get('break_system', False)),
+            target
+        )
+        return [*prefix, *package_specs]
+    
+    def _build_install_prefix(self, user: bool, upgrade: bool, break_system: bool,
+                              target: Optional[str]) -> Tuple[str, ...]:
+        """Build the `pip install` arguments that precede the package specifications"""
+        prefix = [*self._pip_argv, 'install']
+        if user:
+            prefix.append('--user')
+        if break_system:
+            prefix.append('--break-system-packages')
+        if upgrade:
+            prefix.append('--upgrade')
+        if target:
+            prefix.extend(['--target', target])
+        return tuple(prefix)
+    
     def _handle_externally_managed_error(self, package_spec: str, **kwargs) -> bool:
         """Handle externally-managed-environment error with user choices"""
         package_name = package_spec.split('=')[0].split('@')[0]
+        strategies = {
+            'break-system': lambda: self._install_with_break_system_packages(package_spec, **kwargs),
+            'venv': lambda: self._install_with_venv(package_spec, **kwargs),
+            'system': lambda: self._suggest_system_package(package_name),
+        }
         
         self.logger.warning("Detected externally-managed-environment (PEP 668)")
+        
+        strategy = kwargs.get('strategy', self.externally_managed_strategy)
+        if strategy in strategies:
+            self.logger.info(f"Using the '{strategy}' strategy for externally-managed environments")
+            return strategies[strategy]()
+        
+        if not self._is_interactive(**kwargs):
+            self.logger.command_error("install", f"No terminal to choose an install method on (externally_managed_strategy is '{strategy}')", package_name)
+            return False
+        
         self.logger.info("This Python environment is managed by your system package manager.")
         self.logger.info("\nChoose installation method:")
         self.logger.info("  1) Use --break-system-packages (override system protection)")
@@ -134,30 +433,26 @@ class PipManager(PackageManagerBase):
             self.logger.info("Installation cancelled by user")
             return False
         
-        if choice == "1":
-            return self._install_with_break_system_packages(package_spec, **kwargs)
-        elif choice == "2":
-            return self._install_with_venv(package_spec, **kwargs)
-        elif choice == "3":
-            return self._suggest_system_package(package_name)
-        else:
-            self.logger.info("Installation cancelled")
-            return False
+        choices = {"1": 'break-system', "2": 'venv', "3": 'system'}
+        if choice in choices:
+            return strategies[choices[choice]]()
+        
+        self.logger.info("Installation cancelled")
+        return False
+    
+    def _is_interactive(self, **kwargs) -> bool:
+        """Whether we may prompt the user on the terminal"""
+        return not kwargs.get('non_interactive', False) and sys.stdin.isatty()
     
     def _install_with_break_system_packages(self, package_spec: str, **kwargs) -> bool:
         """Install using --break-system-packages flag"""
         try:
             self.logger.info("Installing with --break-system-packages...")
             
-            install_cmd = self.pip_cmd.split() + ['install', '--user', '--break-system-packages']
-            
-            # Add upgrade flag if requested
-            if kwargs.get('upgrade', False):
-                install_cmd.append('--upgrade')
-            
-            install_cmd.append(package_spec)
+            prefix = self._install_prefix(True, bool(kwargs.get('upgrade', False)), True, None)
+            install_cmd = [*prefix, package_spec]
             
-            result = self.run_command(install_cmd)
+            result = self._run_pip(install_cmd)
             
             if result.returncode == 0:
                 package_name = package_spec.split('=')[0].split('@')[0]
@@ -181,18 +476,19 @@ class PipManager(PackageManagerBase):
             venv_dir = Path.home() / '.batman' / 'venvs' / package_name
             venv_dir.parent.mkdir(parents=True, exist_ok=True)
             
-            if venv_dir.exists():
+            if venv_dir.exists() and self._is_interactive(**kwargs):
                 self.logger.warning(f"Virtual environment already exists: {venv_dir}")
                 overwrite = input("Overwrite existing virtual environment? (y/N): ").strip().lower()
                 if overwrite != 'y':
                     self.logger.info("Installation cancelled")
                     return False
                 
-                import shutil
                 shutil.rmtree(venv_dir)
+            elif venv_dir.exists():
+                # Without a terminal, reuse the existing environment
+                self.logger.info(f"Reusing existing virtual environment: {venv_dir}")
             
             # Create virtual environment
-            import subprocess
             create_cmd = [sys.executable, '-m', 'venv', str(venv_dir)]
             result = subprocess.run(create_cmd, capture_output=True, text=True)
             
@@ -236,57 +532,10 @@ class PipManager(PackageManagerBase):
         """Try to install using system package manager instead"""
         self.logger.info(f"Checking if '{package_name}' is available as a system package...")
         
-        # Common Python package name mappings for system packages
-        system_mappings = {
-            'numpy': 'python-numpy',
-            'scipy': 'python-scipy', 
-            'matplotlib': 'python-matplotlib',
-            'pandas': 'python-pandas',
-            'requests': 'python-requests',
-            'flask': 'python-flask',
-            'django': 'python-django',
-            'sympy': 'python-sympy',
-            'pillow': 'python-pillow',
-            'pil': 'python-pillow',
-            'pyqt5': 'python-pyqt5',
-            'pyqt6': 'python-pyqt6',
-            'psutil': 'python-psutil',
-            'lxml': 'python-lxml',
-            'beautifulsoup4': 'python-beautifulsoup4',
-            'selenium': 'python-selenium',
-            'cryptography': 'python-cryptography',
-            'setuptools': 'python-setuptools',
-            'wheel': 'python-wheel',
-            'virtualenv': 'python-virtualenv',
-            'pytest': 'python-pytest',
-            'pylint': 'python-pylint',
-            'black': 'python-black',
-            'flake8': 'python-flake8',
-            'isort': 'python-isort',
-            'mypy': 'python-mypy',
-            'poetry': 'python-poetry',
-            'tox': 'python-tox',
-            'sphinx': 'python-sphinx',
-            'click': 'python-click',
-            'pyyaml': 'python-yaml',
-            'yaml': 'python-yaml',
-            'redis': 'python-redis',
-            'celery': 'python-celery',
-            'sqlalchemy': 'python-sqlalchemy',
-            'alembic': 'python-alembic',
-            'jinja2': 'python-jinja',
-            'markupsafe': 'python-markupsafe',
-            'werkzeug': 'python-werkzeug',
-            'twisted': 'python-twisted',
-            'tornado': 'python-tornado',
-            'aiohttp': 'python-aiohttp',
-            'fastapi': 'python-fastapi',
-        }
-        
-        system_name = system_mappings.get(package_name.lower(), f'python-{package_name}')
+        system_name = _SYSTEM_MAPPINGS.get(package_name.lower(), f'python-{package_name}')
         
         # Detect the system package manager
-        system_manager = self._detect_system_package_manager()
+        system_manager = self._detect_system_package_manager
         if not system_manager:
             self.logger.warning("Could not detect system package manager")
             self.logger.info(f"💡 Try installing with system package manager:")
@@ -331,19 +580,11 @@ class PipManager(PackageManagerBase):
             self.logger.info(f"  {system_manager} install {system_name}")
             return False
     
+    @functools.cached_property
     def _detect_system_package_manager(self) -> Optional[str]:
-        """Detect the system's package manager"""
-        # Check for package managers in order of preference
-        package_managers = [
-            ('pacman', 'pacman'),
-            ('apt', 'apt'),
-            ('yum', 'yum'), 
-            ('dnf', 'dnf'),
-            ('brew', 'brew'),
-        ]
-        
-        for manager_name, command in package_managers:
-            if self.check_command_exists(command):
+        """Detect the system's package manager (probed once per manager)"""
+        for manager_name, command in _SYSTEM_PACKAGE_MANAGERS:
+            if shutil.which(command):
                 self.logger.debug(f"Detected system package manager: {manager_name}")
                 return manager_name
         
@@ -351,15 +592,57 @@ class PipManager(PackageManagerBase):
     
     def update(self, package_name: str, **kwargs) -> bool:
         """Update a Python package"""
-        return self.install(package_name, upgrade=True, **kwargs)
+        kwargs['upgrade'] = True
+        if 'break_system' not in kwargs:
+            kwargs['break_system'] = self._upgrade_breaks_system(**kwargs)
+        
+        try:
+            self.logger.command_start("update", package_name, "pip")
+            
+            if not self.validate_package_name(package_name):
+                raise ValueError(f"Invalid package name: {package_name}")
+            
+            install_cmd = self._build_install_command([package_name], **kwargs)
+            result = self._run_pip(install_cmd, check=False)
+            
+            if result.returncode == 0:
+                self.logger.command_success("update", package_name)
+                success = True
+            elif _EXT_MANAGED_RE.search(result.stderr):
+                # Under PEP 668 the configured strategy decides where the upgrade goes
+                success = self._handle_externally_managed_error(package_name, **kwargs)
+            else:
+                self.logger.command_error("update", f"Update failed: {result.stderr}", package_name)
+                success = False
+            
+            self._invalidate_installed_cache()
+            return success
+        
+        except Exception as e:
+            self.logger.command_error("update", str(e), package_name)
+            return False
+    
+    def _upgrade_breaks_system(self, **kwargs) -> bool:
+        """Whether upgrades should pass --break-system-packages straight away"""
+        strategy = kwargs.get('strategy', self.externally_managed_strategy)
+        # Only this strategy needs the dry-run probe; the others wait for pip to refuse
+        return strategy == 'break-system' and self._needs_break_sys_cached
+    
+    @functools.cached_property
+    def _needs_break_sys_cached(self) -> bool:
+        """Whether pip refuses to install here under PEP 668 (probed once with a dry run)"""
+        probe_cmd = [*self._pip_argv, 'install', '--dry-run', '--no-index', '--no-deps', '--quiet', 'pip']
+        result = self._run_pip(probe_cmd, check=False)
+        return bool(_EXT_MANAGED_RE.search(result.stderr))
     
     def remove(self, package_name: str, **kwargs) -> bool:
         """Remove a Python package"""
         try:
             self.logger.command_start("remove", package_name, "pip")
             
-            uninstall_cmd = self.pip_cmd.split() + ['uninstall', '-y', package_name]
-            result = self.run_command(uninstall_cmd)
+            uninstall_cmd = [*self._pip_argv, 'uninstall', '-y', package_name]
+            result = self._run_pip(uninstall_cmd)
+            self._invalidate_installed_cache()
             
             if result.returncode == 0:
                 self.logger.command_success("remove", package_name)
@@ -376,94 +659,376 @@ class PipManager(PackageManagerBase):
         """Search for Python packages (using pip search alternative)"""
         try:
             # pip search was removed, so we'll use pypi.org API
-            import urllib.request
-            import urllib.parse
-            
-            encoded_query = urllib.parse.quote(query)
-            url = f"https://pypi.org/pypi/{encoded_query}/json"
-            
             try:
-                with urllib.request.urlopen(url) as response:
-                    data = json.loads(response.read())
-                
-                package_info = data.get('info', {})
-                return [{
-                    'name': package_info.get('name', query),
-                    'version': package_info.get('version', 'unknown'),
-                    'description': package_info.get('summary', ''),
-                    'homepage': package_info.get('home_page', ''),
-                    'author': package_info.get('author', ''),
-                }]
-            except:
+                data = self._cached_pypi_json(query)
+            except Exception as e:
                 # If direct package lookup fails, return empty list
                 # In a full implementation, we'd use a proper search API
+                self.logger.debug(f"PyPI lookup for '{query}' failed: {e}")
                 return []
+            
+            return [self._pypi_search_result(data, query)] if data else []
                 
         except Exception as e:
             self.logger.error(f"Search failed: {e}")
             return []
     
+    def search_many(self, queries: List[str], **kwargs) -> Dict[str, List[Dict[str, Any]]]:
+        """Search PyPI for several packages concurrently"""
+        if not queries:
+            return {}
+        
+        if aiohttp is not None:
+            return self._run_async(self.search_many_async(queries))
+        
+        with ThreadPoolExecutor(max_workers=min(len(queries), self.max_parallel_jobs)) as executor:
+            results = executor.map(lambda query: self.search(query, **kwargs), queries)
+            return dict(zip(queries, results))
+    
+    def _run_async(self, coro):
+        """Run a coroutine to completion, on uvloop's event loop on Linux when installed"""
+        if uvloop is not None and sys.platform == 'linux':
+            # asyncio.Runner(loop_factory=...) would need Python 3.11
+            loop = uvloop.new_event_loop()
+            try:
+                return loop.run_until_complete(coro)
+            finally:
+                loop.close()
+        return asyncio.run(coro)
+    
+    async def search_many_async(self, queries: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+        """Fetch PyPI metadata for all queries at once over one aiohttp connection pool"""
+        results = {}
+        pending = []
+        for query in queries:
+            key = self._pypi_cache_key(query)
+            if key in self._pypi_cache:
+                data = self._pypi_cache[key]
+                results[query] = [self._pypi_search_result(data, query)] if data else []
+            else:
+                pending.append(query)
+        
+        if pending:
+            connector = aiohttp.TCPConnector(limit=self.max_parallel_jobs)
+            timeout = aiohttp.ClientTimeout(total=PYPI_TIMEOUT)
+            async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+                fetched = await asyncio.gather(
+                    *(self._fetch_pypi_json_async(session, query) for query in pending),
+                    return_exceptions=True
+                )
+            
+            for query, data in zip(pending, fetched):
+                if isinstance(data, Exception):
+                    self.logger.debug(f"PyPI lookup for '{query}' failed: {data}")
+                    data = None
+                else:
+                    self._remember_pypi_json(self._pypi_cache_key(query), data)
+                results[query] = [self._pypi_search_result(data, query)] if data else []
+        
+        return {query: results[query] for query in queries}
+    
+    async def _fetch_pypi_json_async(self, session, name: str) -> Optional[Dict[str, Any]]:
+        """Fetch a project's JSON metadata from PyPI with aiohttp"""
+        async with session.get(PYPI_JSON_URL.format(urllib.parse.quote(name))) as response:
+            if response.status == 404:
+                return None
+            response.raise_for_status()
+            return await response.json()
+    
+    def _pypi_cache_key(self, name: str) -> Tuple[str, date]:
+        """PyPI responses are reused for the rest of the day"""
+        return (self._normalize_dist_name(name), date.today())
+    
+    def _cached_pypi_json(self, name: str) -> Optional[Dict[str, Any]]:
+        """Fetch PyPI metadata unless it was already fetched today"""
+        key = self._pypi_cache_key(name)
+        if key in self._pypi_cache:
+            return self._pypi_cache[key]
+        
+        data = self._fetch_pypi_json(name)
+        self._remember_pypi_json(key, data)
+        return data
+    
+    def _remember_pypi_json(self, key: Tuple[str, date], data: Optional[Dict[str, Any]]):
+        """Store a PyPI response, evicting the oldest entry once the cache is full"""
+        with self._pypi_cache_lock:
+            if key not in self._pypi_cache and len(self._pypi_cache) >= PYPI_CACHE_SIZE:
+                self._pypi_cache.pop(next(iter(self._pypi_cache)))
+            self._pypi_cache[key] = data
+    
+    def _get_http_session(self):
+        """Create the pooled requests session on first use, if requests is installed"""
+        if requests is None:
+            return None
+        if self._http is None:
+            self._http = requests.Session()
+            self._http.headers['Accept-Encoding'] = 'gzip, deflate'
+        return self._http
+    
+    def _fetch_pypi_json(self, name: str) -> Optional[Dict[str, Any]]:
+        """Fetch a project's JSON metadata from PyPI, or None if it does not exist"""
+        url = PYPI_JSON_URL.format(urllib.parse.quote(name))
+        
+        session = self._get_http_session()
+        if session is not None:
+            response = session.get(url, timeout=PYPI_TIMEOUT)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.json()
+        
+        request = urllib.request.Request(url, headers={'Accept-Encoding': 'gzip'})
+        with urllib.request.urlopen(request, timeout=PYPI_TIMEOUT) as response:
+            body = response.read()
+            if response.headers.get('Content-Encoding') == 'gzip':
+                body = gzip.decompress(body)
+        return _json.loads(body)
+    
+    def _pypi_search_result(self, data: Dict[str, Any], query: str) -> Dict[str, Any]:
+        """Convert PyPI project JSON into a search result entry"""
+        package_info = data.get('info', {})
+        return {
+            'name': package_info.get('name', query),
+            'version': package_info.get('version', 'unknown'),
+            'description': package_info.get('summary', ''),
+            'homepage': package_info.get('home_page', ''),
+            'author': package_info.get('author', ''),
+        }
+    
     def list_installed(self, **kwargs) -> List[Dict[str, Any]]:
         """List installed Python packages"""
         try:
-            list_cmd = self.pip_cmd.split() + ['list', '--format=json']
-            result = self.run_command(list_cmd)
-            
-            if result.returncode == 0:
-                packages = json.loads(result.stdout)
-                return [{
-                    'name': pkg['name'],
-                    'version': pkg['version'],
-                    'manager': 'pip'
-                } for pkg in packages]
-            else:
-                return []
-                
+            return list(self.iter_installed(**kwargs))
         except Exception as e:
             self.logger.error(f"Failed to list packages: {e}")
             return []
     
+    def iter_installed(self, **kwargs) -> Iterator[Dict[str, Any]]:
+        """Yield installed Python packages from the installed package index"""
+        for info in self._ensure_installed_cache().values():
+            yield {
+                'name': info['name'],
+                'version': info['version'],
+                'manager': 'pip'
+            }
+    
     def get_package_info(self, package_name: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a Python package"""
         try:
-            show_cmd = self.pip_cmd.split() + ['show', package_name]
-            result = self.run_command(show_cmd)
+            installed = self._ensure_installed_cache()
+            if self._pip_inspect_supported:
+                return installed.get(self._normalize_dist_name(package_name))
             
-            if result.returncode == 0:
-                info = {}
-                for line in result.stdout.split('\n'):
-                    if ':' in line:
-                        key, value = line.split(':', 1)
-                        info[key.strip().lower().replace('-', '_')] = value.strip()
-                
-                return {
-                    'name': info.get('name', package_name),
-                    'version': info.get('version', 'unknown'),
-                    'description': info.get('summary', ''),
-                    'author': info.get('author', ''),
-                    'homepage': info.get('home_page', ''),
-                    'location': info.get('location', ''),
-                    'dependencies': [dep.strip() for dep in info.get('requires', '').split(',') if dep.strip()],
-                    'manager': 'pip'
-                }
-            else:
-                return None
+            # Older pip without `inspect`: ask for this package alone
+            return self._cached_show(package_name, self._site_packages_stamp())
                 
         except Exception as e:
             self.logger.error(f"Failed to get package info: {e}")
             return None
     
+    def _show_package(self, package_name: str, stamp: Tuple[int, ...]) -> Optional[Dict[str, Any]]:
+        """Run `pip show` for one package (wrapped by the _cached_show LRU)"""
+        show_cmd = [*self._pip_argv, 'show', package_name]
+        result = self._run_pip(show_cmd, check=False)
+        
+        if result.returncode == 0:
+            return self._parse_package_info(result.stdout, package_name)
+        return None
+    
+    def _site_packages_stamp(self) -> Tuple[int, ...]:
+        """Modification times of the site-packages directories, used to detect installs"""
+        stamp = []
+        for path in (sysconfig.get_path('purelib'), sysconfig.get_path('platlib'), site.getusersitepackages()):
+            try:
+                stamp.append(os.stat(path).st_mtime_ns)
+            except (OSError, TypeError):
+                stamp.append(0)
+        return tuple(stamp)
+    
+    def _parse_package_info(self, output: str, package_name: str) -> Dict[str, Any]:
+        """Parse `pip show` output for a single package"""
+        info = {
+            _PIP_SHOW_KEYS[key]: value.rstrip()
+            for key, value in _PIP_SHOW_RE.findall(output)
+            if key in _PIP_SHOW_KEYS
+        }
+        
+        return {
+            'name': info.get('name', package_name),
+            'version': info.get('version', 'unknown'),
+            'description': info.get('summary', ''),
+            'author': info.get('author', ''),
+            'homepage': info.get('home_page', ''),
+            'location': info.get('location', ''),
+            'dependencies': [dep.strip() for dep in info.get('requires', '').split(',') if dep.strip()],
+            'manager': 'pip'
+        }
+    
+    def get_package_info_many(self, package_names: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """Get detailed information about several Python packages with one `pip show`"""
+        results = {name: None for name in package_names}
+        if not package_names:
+            return results
+        
+        try:
+            installed = self._ensure_installed_cache()
+            if self._pip_inspect_supported:
+                return {name: installed.get(self._normalize_dist_name(name)) for name in package_names}
+            
+            # pip show accepts several names and separates the records with '---'
+            show_cmd = [*self._pip_argv, 'show', *package_names]
+            result = self._run_pip(show_cmd, check=False)
+            
+            by_normalized = {self._normalize_dist_name(name): name for name in package_names}
+            for block in _PIP_SHOW_SEPARATOR_RE.split(result.stdout):
+                if not block.strip():
+                    continue
+                info = self._parse_package_info(block, '')
+                requested = by_normalized.get(self._normalize_dist_name(info['name']))
+                if requested:
+                    results[requested] = info
+            
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"Failed to get package info: {e}")
+            return results
+    
+    def _normalize_dist_name(self, name: str) -> str:
+        """Normalize a distribution name for lookups (PEP 503)"""
+        return _DIST_NAME_SEPARATORS_RE.sub('-', name).lower()
+    
+    def _ensure_installed_cache(self) -> Dict[str, Dict[str, Any]]:
+        """Index installed distributions by normalized name with a single pip call"""
+        stamp = self._site_packages_stamp()
+        if self._pip_installed_cache is None or stamp != self._pip_installed_stamp:
+            cache = self._load_inspect_index()
+            if cache is None:
+                cache = self._load_list_index()
+            if cache is None:
+                return {}
+            self._pip_installed_cache = cache
+            self._pip_installed_stamp = stamp
+        
+        return self._pip_installed_cache
+    
+    def _load_inspect_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Build full package info for every distribution from `pip inspect` (pip >= 22.2)"""
+        if self._pip_inspect_supported is False:
+            return None
+        
+        inspect_cmd = [*self._pip_argv, 'inspect']
+        # The report covers every distribution and runs to hundreds of KB
+        result = self._run_pip(inspect_cmd, check=False, log_output=False)
+        if result.returncode != 0:
+            self.logger.debug("pip inspect unavailable, falling back to pip list/show")
+            self._pip_inspect_supported = False
+            return None
+        
+        self._pip_inspect_supported = True
+        index = {}
+        for dist in _json.loads(result.stdout).get('installed', []):
+            info = self._inspect_package_info(dist)
+            index[self._normalize_dist_name(info['name'])] = info
+        return index
+    
+    def _load_list_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Build a name/version index from `pip list`"""
+        list_cmd = [*self._pip_argv, 'list', '--format=json']
+        result = self._run_pip(list_cmd, check=False)
+        if result.returncode != 0:
+            return None
+        
+        return {
+            self._normalize_dist_name(pkg['name']): {
+                'name': pkg['name'],
+                'version': pkg['version'],
+                'manager': 'pip'
+            }
+            for pkg in _json.loads(result.stdout)
+        }
+    
+    def _inspect_package_info(self, dist: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert one `pip inspect` record into the get_package_info dictionary"""
+        metadata = dist.get('metadata', {})
+        metadata_location = dist.get('metadata_location', '')
+        
+        # Match `pip show`'s Requires: only requirements that apply here, without specifiers
+        dependencies = []
+        for requirement in metadata.get('requires_dist', []):
+            if not self._requirement_applies(requirement):
+                continue
+            match = _REQUIREMENT_NAME_RE.match(requirement)
+            if match:
+                dependencies.append(match.group(1))
+        
+        return {
+            'name': metadata.get('name', ''),
+            'version': metadata.get('version', 'unknown'),
+            'description': metadata.get('summary', ''),
+            'author': metadata.get('author') or metadata.get('author_email', ''),
+            'homepage': metadata.get('home_page', ''),
+            'location': str(Path(metadata_location).parent) if metadata_location else '',
+            'dependencies': dependencies,
+            'manager': 'pip'
+        }
+    
+    def _requirement_applies(self, requirement: str) -> bool:
+        """Check whether a Requires-Dist entry applies without any extras selected"""
+        marker = requirement.partition(';')[2]
+        if not marker.strip():
+            return True
+        if Requirement is not None:
+            try:
+                parsed = Requirement(requirement)
+                return parsed.marker.evaluate({'extra': ''})
+            except Exception:
+                pass
+        return 'extra' not in marker
+    
+    def _invalidate_installed_cache(self):
+        """Drop cached package metadata after the environment changed"""
+        self._pip_installed_cache = None
+        self._cached_show.cache_clear()
+    
     def is_installed(self, package_name: str) -> bool:
         """Check if a Python package is installed"""
-        return self.get_package_info(package_name) is not None
+        try:
+            if self._pip_installed_cache is not None and self._pip_installed_stamp == self._site_packages_stamp():
+                return self._normalize_dist_name(package_name) in self._pip_installed_cache
+            
+            # No current index: pip show's exit status answers without parsing its output
+            show_cmd = [*self._pip_argv, 'show', package_name]
+            result = self.run_command(
+                show_cmd,
+                capture_output=False,
+                check=False,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+    
+    def are_installed(self, package_names: List[str]) -> Dict[str, bool]:
+        """Check several Python packages against a single index of installed distributions"""
+        try:
+            installed = self._ensure_installed_cache()
+            return {name: self._normalize_dist_name(name) in installed for name in package_names}
+        except Exception:
+            return {name: False for name in package_names}
     
     def get_version(self, package_name: str) -> Optional[str]:
         """Get installed version of a Python package"""
-        info = self.get_package_info(package_name)
-        return info.get('version') if info else None
+        try:
+            info = self._ensure_installed_cache().get(self._normalize_dist_name(package_name))
+            return info['version'] if info else None
+        except Exception:
+            return None
     
+    @functools.cached_property
     def _in_virtual_env(self) -> bool:
-        """Check if running in a virtual environment"""
+        """Check if running in a virtual environment (fixed for the life of the process)"""
         return hasattr(sys, 'real_prefix') or (
             hasattr(sys, 'base_prefix') and sys.base_prefix != sys.prefix
         )
@@ -472,23 +1037,20 @@ class PipManager(PackageManagerBase):
         """Update all installed packages"""
         try:
             # Get list of outdated packages
-            outdated_cmd = self.pip_cmd.split() + ['list', '--outdated', '--format=json']
-            result = self.run_command(outdated_cmd)
+            outdated_cmd = [*self._pip_argv, 'list', '--outdated', '--format=json']
             
-            if result.returncode != 0:
-                return []
-            
-            outdated_packages = json.loads(result.stdout)
-            updated_packages = []
+            specs = []
+            for pkg in self._iter_pip_json(outdated_cmd):
+                self.logger.info(f"Updating {pkg['name']} from {pkg['version']} to {pkg['latest_version']}")
+                specs.append((pkg['name'], None))
             
-            for pkg in outdated_packages:
-                package_name = pkg['name']
-                self.logger.info(f"Updating {package_name} from {pkg['version']} to {pkg['latest_version']}")
-                
-                if self.update(package_name, **kwargs):
-                    updated_packages.append(package_name)
-            
-            return updated_packages
+            # One pip run resolves and upgrades everything together
+            if not specs:
+                return []
+            kwargs.setdefault('upgrade', True)
+            if 'break_system' not in kwargs:
+                kwargs['break_system'] = self._upgrade_breaks_system(**kwargs)
+            return self.install_many(specs, **kwargs)
             
         except Exception as e:
             self.logger.error(f"Failed to update packages: {e}")
@@ -0,0 +1,122 @@
+"""
+Persistent pip worker for Batman package manager
+
+Imports pip once and runs pip commands sent as JSON lines on stdin, replying
+with one JSON line per command on stdout, so bulk operations don't pay for
+interpreter startup and pip's imports on every call.
+
+Run directly as a script under the interpreter whose pip should be used:
+    python3 pip_worker.py
+"""
+
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+# Commands after which the worker exits and is replaced
+_RESTARTING_COMMANDS = (['install'], ['uninstall'])
+
+class PipWorkerClient:
+    """Client side of the pip worker protocol"""
+    
+    def __init__(self, python: str = sys.executable):
+        self.python = python
+        self._proc: Optional[subprocess.Popen] = None
+        self._lock = threading.Lock()
+        self.served = 0
+    
+    def start(self):
+        """Start the worker process"""
+        self._proc = subprocess.Popen(
+            [self.python, str(Path(__file__).resolve())],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True
+        )
+    
+    def run(self, args: List[str]) -> subprocess.CompletedProcess:
+        """Run `pip <args>` in the worker"""
+        with self._lock:
+            if self._proc is None or self._proc.poll() is not None:
+                raise ConnectionError("pip worker is not running")
+            
+            self._proc.stdin.write(json.dumps({'args': args}) + '\n')
+            self._proc.stdin.flush()
+            line = self._proc.stdout.readline()
+            if not line:
+                raise ConnectionError("pip worker exited")
+            self.served += 1
+            
+            if args[:1] in _RESTARTING_COMMANDS:
+                # The worker exits after changing the environment; start a fresh one
+                self._proc.stdin.close()
+                self._proc.wait()
+                self.start()
+        
+        response = json.loads(line)
+        
+        return subprocess.CompletedProcess(
+            ['pip'] + args,
+            response['returncode'],
+            stdout=response['stdout'],
+            stderr=response['stderr']
+        )
+    
+    def close(self):
+        """Stop the worker; it exits once its stdin is closed"""
+        if self._proc is None:
+            return
+        try:
+            self._proc.stdin.close()
+            self._proc.wait(timeout=5)
+        except (OSError, subprocess.TimeoutExpired):
+            self._proc.kill()
+        self._proc = None
+
+def _run_pip(pip_main, args: List[str]) -> dict:
+    """Run one pip command in-process, capturing what it prints"""
+    stdout, stderr = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(stdout), contextlib.redirect_stderr(stderr):
+        try:
+            returncode = pip_main(args)
+        except SystemExit as e:
+            returncode = e.code if isinstance(e.code, int) else 1
+        except Exception as e:
+            print(f"pip worker: {e}", file=sys.stderr)
+            returncode = 1
+    return {'returncode': returncode or 0, 'stdout': stdout.getvalue(), 'stderr': stderr.getvalue()}
+
+def main():
+    from pip._internal.cli.main import main as pip_main
+    
+    # Keep the protocol on private descriptors; pip and its subprocesses get /dev/null
+    requests = os.fdopen(os.dup(0), 'r')
+    responses = os.fdopen(os.dup(1), 'w')
+    devnull = os.open(os.devnull, os.O_RDWR)
+    os.dup2(devnull, 0)
+    os.dup2(devnull, 1)
+    sys.stdin = open(os.devnull)
+    
+    for line in requests:
+        args = json.loads(line).get('args')
+        if not isinstance(args, list):
+            response = {'returncode': 1, 'stdout': '', 'stderr': f'invalid request: {line.strip()}'}
+        else:
+            response = _run_pip(pip_main, args)
+        responses.write(json.dumps(response) + '\n')
+        responses.flush()
+        
+        # pip's metadata backend keeps what it saw at import time, and pip
+        # may have upgraded itself; later commands need a fresh process
+        if isinstance(args, list) and args[:1] in _RESTARTING_COMMANDS:
+            break
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -2,10 +2,38 @@
 Configuration management for Batman package manager
 """
 
+import copy
 import json
 import os
+import pickle
+import tempfile
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:
+    # Optional; without it configuration is written with the json module
+    orjson = None
+
+def _atomic_write(path: Path, data: bytes):
+    """Replace path with data in one step, so a crash never leaves a truncated file"""
+    try:
+        mode = path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
 
 class BatmanConfig:
     """Configuration management class"""
@@ -14,6 +42,8 @@ class BatmanConfig:
         self.config_dir = Path.home() / '.batman'
         self.config_file = self.config_dir / 'config.json'
         self.packages_db = self.config_dir / 'packages.json'
+        # Merged config pickled alongside the stat of the config.json it came from
+        self.config_cache = self.config_dir / 'config.cache.pkl'
         self.cache_dir = self.config_dir / 'cache'
         
         # Default configuration
@@ -22,7 +52,8 @@ class BatmanConfig:
                 'pip': {
                     'enabled': True,
                     'install_dir': str(Path.home() / '.batman' / 'packages' / 'python'),
-                    'auto_detect_files': ['requirements.txt', 'pyproject.toml', 'setup.py']
+                    'auto_detect_files': ['requirements.txt', 'pyproject.toml', 'setup.py'],
+                    'use_worker': False
                 },
                 'npm': {
                     'enabled': True,
@@ -42,7 +73,8 @@ class BatmanConfig:
                 'pacman': {
                     'enabled': True,
                     'install_dir': '/usr/local',
-                    'auto_detect_files': []
+                    'auto_detect_files': [],
+                    'use_privileged_helper': False
                 }
             },
             'global_settings': {
@@ -50,6 +82,7 @@ class BatmanConfig:
                 'update_interval_days': 7,
                 'parallel_downloads': True,
                 'max_parallel_jobs': 4,
+                'externally_managed_strategy': 'prompt',
                 'backup_before_update': True,
                 'log_level': 'INFO'
             }
@@ -57,6 +90,7 @@ class BatmanConfig:
         
         self._ensure_config_exists()
         self.config = self._load_config()
+        self._flat = self._flatten(self.config)
     
     def _ensure_config_exists(self):
         """Ensure configuration directory and files exist"""
@@ -78,43 +112,89 @@ class BatmanConfig:
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from file"""
         try:
+            stamp = self._config_stamp()
+            cached = self._load_cached_config(stamp)
+            if cached is not None:
+                return cached
+            
             with open(self.config_file, 'r') as f:
                 config = json.load(f)
             # Merge with defaults for any missing keys
-            return self._merge_configs(self.default_config, config)
+            merged = self._merge_configs(self.default_config, config)
+            self._save_config_cache(stamp, merged)
+            return merged
         except (json.JSONDecodeError, FileNotFoundError):
             return self.default_config.copy()
     
+    def _config_stamp(self) -> Tuple[int, int]:
+        """Modification time and size of config.json"""
+        st = self.config_file.stat()
+        return (st.st_mtime_ns, st.st_size)
+    
+    def _load_cached_config(self, stamp: Tuple[int, int]) -> Optional[Dict[str, Any]]:
+        """Return the cached merged config if it was built from this config.json and these defaults"""
+        try:
+            with open(self.config_cache, 'rb') as f:
+                cached_stamp, defaults, config = pickle.load(f)
+        except Exception:
+            # Missing, truncated or from an incompatible version: just rebuild it
+            return None
+        
+        if cached_stamp != stamp or defaults != self.default_config:
+            return None
+        return config
+    
+    def _save_config_cache(self, stamp: Tuple[int, int], config: Dict[str, Any]):
+        """Pickle the merged config for the next run"""
+        try:
+            with open(self.config_cache, 'wb') as f:
+                pickle.dump((stamp, self.default_config, config), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except OSError:
+            pass
+    
     def _merge_configs(self, default: Dict, user: Dict) -> Dict:
-        """Recursively merge user config with defaults"""
-        result = default.copy()
-        for key, value in user.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_configs(result[key], value)
-            else:
-                result[key] = value
+        """Merge user config into a copy of the defaults, section by section"""
+        result = copy.deepcopy(default)
+        stack = [(result, user)]
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                if isinstance(value, dict) and isinstance(target.get(key), dict):
+                    stack.append((target[key], value))
+                else:
+                    target[key] = value
         return result
     
     def _save_config(self, config: Dict[str, Any]):
         """Save configuration to file"""
-        with open(self.config_file, 'w') as f:
-            json.dump(config, f, indent=2)
+        self.config_cache.unlink(missing_ok=True)
+        self._write_json(self.config_file, config)
     
     def _save_packages_db(self, packages: Dict[str, Any]):
         """Save packages database to file"""
-        with open(self.packages_db, 'w') as f:
-            json.dump(packages, f, indent=2)
+        self._write_json(self.packages_db, packages)
+    
+    def _write_json(self, path: Path, data: Dict[str, Any]):
+        """Write data as JSON indented by two spaces"""
+        if orjson is not None:
+            payload = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+        else:
+            payload = json.dumps(data, indent=2).encode()
+        _atomic_write(path, payload)
+    
+    def _flatten(self, config: Dict[str, Any], prefix: str = '') -> Dict[str, Any]:
+        """Index every value in the config, nested sections included, by its dot path"""
+        flat = {}
+        for key, value in config.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, dict):
+                flat.update(self._flatten(value, f"{path}."))
+        return flat
     
     def get(self, key_path: str, default=None):
         """Get configuration value using dot notation (e.g., 'package_managers.pip.enabled')"""
-        keys = key_path.split('.')
-        value = self.config
-        for key in keys:
-            if isinstance(value, dict) and key in value:
-                value = value[key]
-            else:
-                return default
-        return value
+        return self._flat.get(key_path, default)
     
     def set(self, key_path: str, value):
         """Set configuration value using dot notation"""
@@ -125,6 +205,8 @@ class BatmanConfig:
                 config[key] = {}
             config = config[key]
         config[keys[-1]] = value
+        # The new value may replace a whole section, so rebuild the index
+        self._flat = self._flatten(self.config)
         self._save_config(self.config)
     
     def get_manager_config(self, manager_name: str) -> Dict[str, Any]:
@@ -135,6 +217,11 @@ class BatmanConfig:
         """Check if a package manager is enabled"""
         return self.get_manager_config(manager_name).get('enabled', False)
 
+_CONFIG: Optional[BatmanConfig] = None
+
 def load_config() -> BatmanConfig:
-    """Load and return Batman configuration"""
-    return BatmanConfig() 
\ No newline at end of file
+    """Load and return Batman configuration, shared for the rest of the process"""
+    global _CONFIG
+    if _CONFIG is None:
+        _CONFIG = BatmanConfig()
+    return _CONFIG 
\ No newline at end of file
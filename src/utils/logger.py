@@ -2,11 +2,89 @@
 Logging utilities for Batman package manager
 """
 
+import atexit
+import functools
+import json
 import logging
+import logging.handlers
+import os
+import queue
 import sys
+import threading
 from pathlib import Path
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:
+    # Optional; without it log file lines are encoded with the json module
+    orjson = None
+
+# None of Batman's formatters use the thread, process or task fields, so
+# don't collect them for every record
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.logAsyncioTasks = False
+
+# File records are buffered and written in batches of up to this many;
+# buffered output is flushed at least every _FLUSH_INTERVAL seconds
+_FILE_BUFFER_CAPACITY = 512
+_FLUSH_INTERVAL = 2.0
+
+# Serializes setup_logger so concurrent callers don't both add handlers
+_SETUP_LOCK = threading.Lock()
+
+# Level names accepted by setup_logger and BatmanLogger.setLevel
+_LEVELS = {
+    'NOTSET': logging.NOTSET,
+    'DEBUG': logging.DEBUG,
+    'INFO': logging.INFO,
+    'WARN': logging.WARNING,
+    'WARNING': logging.WARNING,
+    'ERROR': logging.ERROR,
+    'FATAL': logging.CRITICAL,
+    'CRITICAL': logging.CRITICAL,
+}
+
+# Message prefixes, shared by the BatmanLogger templates below
+_BAT = "🦇 Starting "
+_PREFIX_SUCCESS = "✅ "
+_PREFIX_FAIL = "❌ "
+_PREFIX_PKG = "📦 Package: "
+_PREFIX_UPDATE = "🔄 Update available for "
+_PREFIX_PROGRESS = "⏳ "
+_PREFIX_WARN = "⚠️  "
+_PREFIX_DRY = "🔍 [DRY RUN] Would execute: "
+
+# BatmanLogger message templates, keyed on which optional arguments are present
+_START_TMPL = {
+    (False, False): _BAT + "%s",
+    (True, False): _BAT + "%s for package '%s'",
+    (False, True): _BAT + "%s using %s",
+    (True, True): _BAT + "%s for package '%s' using %s",
+}
+_SUCCESS_TMPL = {
+    (False, False): _PREFIX_SUCCESS + "%s completed successfully",
+    (True, False): _PREFIX_SUCCESS + "%s completed successfully for '%s'",
+    (False, True): _PREFIX_SUCCESS + "%s completed successfully - %s",
+    (True, True): _PREFIX_SUCCESS + "%s completed successfully for '%s' - %s",
+}
+_ERROR_TMPL = {
+    False: _PREFIX_FAIL + "%s failed: %s",
+    True: _PREFIX_FAIL + "%s failed for '%s': %s",
+}
+_PACKAGE_TMPL = {
+    (False, False): _PREFIX_PKG + "%s",
+    (True, False): _PREFIX_PKG + "%s (v%s)",
+    (False, True): _PREFIX_PKG + "%s [%s]",
+    (True, True): _PREFIX_PKG + "%s (v%s) [%s]",
+}
+_UPDATE_TMPL = _PREFIX_UPDATE + "%s: %s → %s"
+_DRY_RUN_TMPL = _PREFIX_DRY + "%s"
+_PROGRESS_TMPL = _PREFIX_PROGRESS + "%s"
+_WARNING_TMPL = _PREFIX_WARN + "%s"
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter with colors for different log levels"""
     
@@ -20,131 +98,229 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'      # Reset
     }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Colored level names are built once, indexed by level number so
+        # format() needs no hashing; custom levels stay uncolored
+        colored = [None] * (logging.CRITICAL + 1)
+        for level, color in self.COLORS.items():
+            if level != 'RESET':
+                colored[_LEVELS[level]] = f"{color}{level}{self.COLORS['RESET']}"
+        self._LVL_COLORED = tuple(colored)
+    
     def format(self, record):
-        # Add color to levelname
-        if record.levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[record.levelname]}{record.levelname}{self.COLORS['RESET']}"
-        
-        return super().format(record)
+        # Add color to levelname, restoring it for the handlers that follow
+        original = record.levelname
+        if record.levelno <= logging.CRITICAL:
+            record.levelname = self._LVL_COLORED[record.levelno] or original
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = original
+
+def _dumps(obj) -> str:
+    """Serialize obj as compact JSON; datetimes and the like are handled by orjson natively"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(',', ':'), default=str)
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """Stream handler that leaves buffering to the stream, flushing only for warnings and errors"""
+    
+    def emit(self, record):
+        try:
+            # Lines go through the stream's own buffer, which print() shares,
+            # so they stay in order with other output
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.WARNING:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+class JsonFormatter(logging.Formatter):
+    """Formatter writing one JSON object per record, for log processors"""
+    
+    def format(self, record):
+        entry = {
+            'ts': record.created,
+            'level': record.levelname,
+            'name': record.name,
+            'msg': record.getMessage()
+        }
+        return _dumps(entry)
+
+def _start_flusher(handler: logging.Handler, interval: float) -> threading.Event:
+    """Flush a handler every interval seconds from one daemon thread, until the returned event is set"""
+    stopped = threading.Event()
+    
+    def run():
+        while not stopped.wait(interval):
+            handler.flush()
+    
+    threading.Thread(target=run, name=f'{handler.name}.flush', daemon=True).start()
+    return stopped
+
+def _file_level(level: int) -> int:
+    """Level for the log file: everything when BATMAN_DEBUG_FILE is set"""
+    return logging.DEBUG if os.environ.get('BATMAN_DEBUG_FILE') else level
+
+@functools.lru_cache(maxsize=None)
+def _ensure_log_dir() -> Path:
+    """Resolve and create the log directory, once per process"""
+    log_dir = Path.home() / '.batman' / 'logs'
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return log_dir
 
 def setup_logger(name: str = 'batman', level: str = 'INFO') -> 'BatmanLogger':
     """Setup and configure logger for Batman package manager"""
     
     logger = logging.getLogger(name)
     
-    # Avoid adding multiple handlers if logger already exists
-    if logger.handlers:
-        return logger
+    with _SETUP_LOCK:
+        # Avoid adding multiple handlers if logger already exists
+        if not any(handler.name == 'batman.queue' for handler in logger.handlers):
+            logger._batman_wrapper = _configure_logger(logger, level)
+        return logger._batman_wrapper
+
+def _configure_logger(logger: logging.Logger, level: str) -> 'BatmanLogger':
+    """Attach Batman's handlers to logger"""
     
     # Set level
-    numeric_level = getattr(logging, level.upper(), logging.INFO)
-    logger.setLevel(numeric_level)
+    numeric_level = _LEVELS.get(level.upper(), logging.INFO)
+    file_level = _file_level(numeric_level)
+    logger.setLevel(min(numeric_level, file_level))
     
-    # Create console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    # Create console handler; a terminal gets each line as it is logged,
+    # while a pipe or file is flushed only when stdout's buffer fills
+    is_tty = sys.stdout.isatty()
+    if is_tty:
+        console_handler = logging.StreamHandler(sys.stdout)
+    else:
+        console_handler = BufferedStreamHandler(sys.stdout)
     console_handler.setLevel(numeric_level)
+    console_handler.name = 'batman.console'
     
-    # Create colored formatter
-    formatter = ColoredFormatter(
-        fmt='%(levelname)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    # Color only a terminal, and honor the NO_COLOR convention
+    use_color = is_tty and os.environ.get('NO_COLOR') is None
+    formatter_class = ColoredFormatter if use_color else logging.Formatter
+    formatter = formatter_class(fmt='%(levelname)s | %(message)s')
     console_handler.setFormatter(formatter)
     
-    # Add handler to logger
+    # The console stays synchronous so its lines keep their place among
+    # print() output and prompts
     logger.addHandler(console_handler)
     
-    # Create file handler for persistent logging
-    log_dir = Path.home() / '.batman' / 'logs'
-    log_dir.mkdir(parents=True, exist_ok=True)
-    
-    file_handler = logging.FileHandler(log_dir / 'batman.log')
+    # Create file handler for persistent logging; the file is opened on first write
+    file_handler = logging.FileHandler(_ensure_log_dir() / 'batman.log', delay=True)
     file_handler.setLevel(logging.DEBUG)
     
-    # Create file formatter (without colors)
-    file_formatter = logging.Formatter(
-        fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
+    # Write JSON lines to the file so log processors don't have to parse text
+    file_handler.setFormatter(JsonFormatter())
+    
+    # Coalesce file writes; errors are written out straight away
+    buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=_FILE_BUFFER_CAPACITY,
+        flushLevel=logging.ERROR,
+        target=file_handler,
+        flushOnClose=True
     )
-    file_handler.setFormatter(file_formatter)
+    buffered_file_handler.setLevel(file_level)
+    buffered_file_handler.name = 'batman.file'
+    # At exit (last registered runs first) the listener drains, the flusher
+    # stops, then the buffer is flushed a final time
+    atexit.register(buffered_file_handler.flush)
+    atexit.register(_start_flusher(buffered_file_handler, _FLUSH_INTERVAL).set)
     
-    # Add file handler to logger
-    logger.addHandler(file_handler)
+    # File records are only enqueued; a background listener does the
+    # file I/O so callers never block on it
+    log_queue = queue.Queue(-1)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.name = 'batman.queue'
+    logger.addHandler(queue_handler)
+    listener = logging.handlers.QueueListener(
+        log_queue, buffered_file_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
     
-    return BatmanLogger(logger)
+    return BatmanLogger(logger, listener)
 
 class BatmanLogger:
     """Enhanced logger with Batman-specific functionality"""
     
-    def __init__(self, logger: logging.Logger):
+    __slots__ = ('logger', 'listener', '_debug', '_info', '_warning', '_error')
+    
+    def __init__(self, logger: logging.Logger,
+                 listener: Optional[logging.handlers.QueueListener] = None):
         self.logger = logger
+        self.listener = listener
+        # Bound once; the methods stay valid across level changes
+        self._debug = logger.debug
+        self._info = logger.info
+        self._warning = logger.warning
+        self._error = logger.error
+    
+    # Messages are passed as %-templates plus arguments so that records
+    # filtered out by level are never formatted; the templates are picked
+    # by which optional arguments were given
     
     def command_start(self, command: str, package: str = "", manager: str = ""):
         """Log the start of a command"""
-        msg = f"🦇 Starting {command}"
-        if package:
-            msg += f" for package '{package}'"
-        if manager:
-            msg += f" using {manager}"
-        self.logger.info(msg)
+        self._info(_START_TMPL[bool(package), bool(manager)], command, *filter(None, (package, manager)))
     
     def command_success(self, command: str, package: str = "", details: str = ""):
         """Log successful command completion"""
-        msg = f"✅ {command} completed successfully"
-        if package:
-            msg += f" for '{package}'"
-        if details:
-            msg += f" - {details}"
-        self.logger.info(msg)
+        self._info(_SUCCESS_TMPL[bool(package), bool(details)], command, *filter(None, (package, details)))
     
     def command_error(self, command: str, error: str, package: str = ""):
         """Log command error"""
-        msg = f"❌ {command} failed"
-        if package:
-            msg += f" for '{package}'"
-        msg += f": {error}"
-        self.logger.error(msg)
+        self._error(_ERROR_TMPL[bool(package)], command, *filter(None, (package,)), error)
     
     def package_info(self, package: str, version: str = "", manager: str = ""):
         """Log package information"""
-        msg = f"📦 Package: {package}"
-        if version:
-            msg += f" (v{version})"
-        if manager:
-            msg += f" [{manager}]"
-        self.logger.info(msg)
+        self._info(_PACKAGE_TMPL[bool(version), bool(manager)], package, *filter(None, (version, manager)))
     
     def update_available(self, package: str, current: str, latest: str):
         """Log available update"""
-        self.logger.info(f"🔄 Update available for {package}: {current} → {latest}")
+        self._info(_UPDATE_TMPL, package, current, latest)
     
     def dry_run(self, action: str):
         """Log dry run action"""
-        self.logger.info(f"🔍 [DRY RUN] Would execute: {action}")
+        self._info(_DRY_RUN_TMPL, action)
     
     def progress(self, message: str):
         """Log progress message"""
-        self.logger.info(f"⏳ {message}")
+        self._info(_PROGRESS_TMPL, message)
     
     def warning(self, message: str):
         """Log warning message"""
-        self.logger.warning(f"⚠️  {message}")
+        self._warning(_WARNING_TMPL, message)
     
-    def debug(self, message: str):
+    def debug(self, message: str, *args):
         """Log debug message"""
-        self.logger.debug(message)
+        self._debug(message, *args)
     
-    def info(self, message: str):
+    def info(self, message: str, *args):
         """Log info message"""
-        self.logger.info(message)
+        self._info(message, *args)
     
-    def error(self, message: str):
+    def error(self, message: str, *args):
         """Log error message"""
-        self.logger.error(message)
+        self._error(message, *args)
     
     def setLevel(self, level: str):
         """Set logger level"""
-        numeric_level = getattr(logging, level.upper(), logging.INFO)
-        self.logger.setLevel(numeric_level)
+        numeric_level = _LEVELS.get(level.upper(), logging.INFO)
+        file_level = _file_level(numeric_level)
+        self.logger.setLevel(min(numeric_level, file_level))
+        if self.listener:
+            # The file handler lives on the listener, behind the queue handler;
+            # let it finish records logged under the old level first
+            self.listener.queue.join()
+            for handler in self.listener.handlers:
+                handler.setLevel(file_level)
         for handler in self.logger.handlers:
-            handler.setLevel(numeric_level) 
\ No newline at end of file
+            if handler.name != 'batman.queue':
+                handler.setLevel(numeric_level) 
\ No newline at end of file